@@ -1,11 +1,25 @@
 from typing import List, Dict, Any, Optional
-import json
+import asyncio
+import hashlib
+import logging
 import os
-from datetime import datetime
+import re
+from dataclasses import dataclass, field
+from functools import cached_property
+from datetime import datetime, timedelta
+import numpy as np
+import pytz
+from lru import LRU
 from app.services.ai_service import AIService
 from app.agents.memory_agent import MemoryAgent
 from app.agents.task_agent import TaskAgent
 from app.tools.web_search import get_web_search
+from app.utils.keyword_automaton import KeywordAutomaton
+from app.utils.memory_index import MemoryIndex
+from app.utils.score_kernels import overlap_scores, pack_task_keys
+from app.utils.semantic_cache import SemanticResponseCache
+
+logger = logging.getLogger(__name__)
 
 # Pipeline imports (optional - for new multi-stage architecture)
 try:
@@ -15,6 +29,9 @@ except ImportError:
     PIPELINE_AVAILABLE = False
     Pipeline = None
 
+# Brisbane timezone
+BRISBANE_TZ = pytz.timezone('Australia/Brisbane')
+
 # Max context limits to avoid token overflow
 MAX_MEMORIES = 5
 MAX_TASKS_DEFAULT = 5  # Normal requests
@@ -23,14 +40,210 @@ MAX_CONVERSATIONS_DEFAULT = 5  # Normal requests
 MAX_CONVERSATIONS_DISCUSSION = 8  # For multi-turn discussions
 MAX_VALUE_LENGTH = 200
 
+# Semantic response cache: only read-only turns of at least this many words are cached
+CACHEABLE_INTENTS = frozenset(['info_request', 'calendar_request'])
+CACHE_MIN_WORDS = 3
+ACTION_KEYS = ('memory_actions', 'task_actions', 'calendar_actions', 'email_actions', 'keep_actions')
+# Turns whose question or answer mentions a date or time are never cached: "what's due today" and
+# "what's due tomorrow" embed almost identically, and such answers go stale as the clock moves
+TIME_DEPENDENT_PATTERN = re.compile(
+    r"\d|\b(?:today|tonight|tomorrow|yesterday|now|morning|afternoon|evening|week|weekend|month|year"
+    r"|due|overdue|deadline|when|time|date|schedule"
+    r"|monday|tuesday|wednesday|thursday|friday|saturday|sunday"
+    r"|january|february|march|april|may|june|july|august|september|october|november|december)\b",
+    re.IGNORECASE
+)
+
+# Longest intent name is ~5 tokens; leaves headroom without paying for a full sentence
+INTENT_MAX_TOKENS = 8
+
+# Below this many messages should_end_conversation skips the LLM state check
+STATE_CHECK_MIN_TURNS = 6
+
+# Where per-user semantic memory indexes are persisted
+MEMORY_INDEX_DIR = os.getenv('MEMORY_INDEX_DIR', os.path.join('data', 'memory_index'))
+
+# Task ordering for context: pending first, then by priority
+PRIORITY_ORDER = {'critical': 0, 'high': 1, 'medium': 2, 'low': 3}
+
+
+# Goodbye signals that end a conversation (whole words, so "maybe"/"undone" don't match)
+_GOODBYE_RE = re.compile(r"\b(bye|goodbye|see\s+you|thanks|thank\s+you|that'?s\s+all|done)\b", re.IGNORECASE)
+
+# Dialogue line prefixes for conversation history; any non-user message is the assistant
+_SPEAKER_PREFIX = {'user': 'User: '}
+
+
+def _task_sort_key(task: Dict) -> int:
+    """Pack (not pending, priority rank) into one small int so comparisons stay int-vs-int"""
+    pending_bit = 0 if task.get('status') == 'pending' else 1
+    return (pending_bit << 2) | PRIORITY_ORDER.get(task.get('priority', 'medium'), 2)
+
+def _trunc(value, limit: int) -> str:
+    """Stringify and cap at limit chars; short strings are returned as-is"""
+    if not isinstance(value, str):
+        value = str(value)
+    return value if len(value) <= limit else value[:limit]
+
+
+def _format_recent(conversations: List[Dict], count: int = 3, max_chars: int = 200) -> str:
+    """Last few messages as compact "Speaker: content" lines for short prompts"""
+    return "\n".join(
+        _SPEAKER_PREFIX.get(conv.get('message_type', 'user'), 'Assistant: ') + _trunc(conv.get('content', ''), max_chars)
+        for conv in conversations[-count:]
+    )
+
+
+# Lookup tables for formatting calendar event times without strftime
+_MONTHS = ('', 'Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+_DOW = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+
+
+def _weekday(year: int, month: int, day: int) -> int:
+    """Day of week (Monday=0) via Zeller's congruence"""
+    if month < 3:
+        month += 12
+        year -= 1
+    k, j = year % 100, year // 100
+    h = (day + (13 * (month + 1)) // 5 + k + k // 4 + j // 4 + 5 * j) % 7  # 0 = Saturday
+    return (h + 5) % 7
+
+
+# Event start: date (all-day) or RFC3339 datetime, parsed and classified in one match
+_ISO_RE = re.compile(r'^(\d{4})-(\d{2})-(\d{2})(?:T(\d{2}):(\d{2})(?::\d{2})?(?:\.\d+)?(Z|[+-]\d{2}:?\d{2})?)?$')
+
+
+def _format_event_time(start_str: str) -> str:
+    """Format an event start as '%I:%M%p on %a %b %d' in the event's own offset, or 'All day on ...'.
+
+    Google Calendar returns canonical 'YYYY-MM-DD[THH:MM...]' strings, so one regex
+    match both classifies and extracts the fields; anything else goes through
+    fromisoformat/strftime.
+    """
+    match = _ISO_RE.match(start_str)
+    if match:
+        if match.group(4) is None:
+            return f"All day on {start_str}"
+        year, month, day, hour, minute = map(int, match.group(1, 2, 3, 4, 5))
+        if 1 <= month <= 12 and 1 <= day <= 31 and hour <= 23 and minute <= 59:
+            ampm = 'AM' if hour < 12 else 'PM'
+            return f"{hour % 12 or 12:02d}:{minute:02d}{ampm} on {_DOW[_weekday(year, month, day)]} {_MONTHS[month]} {day:02d}"
+    if 'T' not in start_str:
+        return f"All day on {start_str}"
+    dt = datetime.fromisoformat(start_str.replace('Z', '+00:00'))
+    return dt.strftime('%I:%M%p on %a %b %d')
+
 # Keywords that indicate user wants to discuss tasks
-TASK_DISCUSSION_KEYWORDS = [
+TASK_DISCUSSION_KEYWORDS = frozenset([
     'priorit', 'too many', 'too much', 'overwhelm', 'workload', 'what should i',
     'how do i', 'help me with', 'best way', 'which task', 'what task',
     'to do list', 'todo', 'to-do', 'my tasks', 'busy', 'get through',
     'tackle', 'approach', 'strategy', 'plan', 'focus on', 'juggle',
     'manage my', 'work is nuts', 'stressed', 'swamped'
-]
+])
+
+# Keywords that indicate the user is asking about their calendar
+CALENDAR_KEYWORDS = frozenset([
+    'calendar', 'event', 'schedule', 'scheduled', 'meeting', 'appointment',
+    'busy', 'free', 'today', 'tomorrow', 'this week', 'next week', 'week'
+])
+
+# Event titles containing these are daily recurring noise (Panchang, Yoga Nidra, Gratitude)
+DAILY_RECURRING_KEYWORDS = frozenset(['panchang', 'yoga nidra', 'gratitude', 'meditation', 'daily'])
+
+# Single automaton classifying all keyword categories in one pass over the text
+INTENT_AUTOMATON = KeywordAutomaton({
+    'calendar': CALENDAR_KEYWORDS,
+    'task_discussion': TASK_DISCUSSION_KEYWORDS,
+    'daily_recurring': DAILY_RECURRING_KEYWORDS,
+})
+
+
+@dataclass(slots=True)
+class MsgFeatures:
+    """Per-message text features, computed once and shared by the context helpers"""
+    lower: str
+    tokens: frozenset
+    intents: frozenset
+
+    @classmethod
+    def from_message(cls, user_message: str) -> 'MsgFeatures':
+        lower = user_message.lower()
+        return cls(lower=lower, tokens=frozenset(lower.split()), intents=INTENT_AUTOMATON.categories(lower))
+
+
+@dataclass(slots=True)
+class MemoryColumns:
+    """Selected memories as parallel columns; relevance is None for keyword matches"""
+    keys: List[str] = field(default_factory=list)
+    values: List[str] = field(default_factory=list)
+    categories: List[str] = field(default_factory=list)
+    relevances: List[Optional[float]] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def append(self, key: str, value: str, category: str, relevance: Optional[float] = None):
+        self.keys.append(key)
+        self.values.append(value)
+        self.categories.append(category)
+        self.relevances.append(relevance)
+
+    def to_records(self) -> List[Dict]:
+        records = []
+        for key, value, category, relevance in zip(self.keys, self.values, self.categories, self.relevances):
+            record = {"key": key, "value": value, "category": category}
+            if relevance is not None:
+                record["relevance"] = relevance
+            records.append(record)
+        return records
+
+
+@dataclass(slots=True)
+class TaskColumns:
+    """Selected tasks as parallel columns"""
+    titles: List[str] = field(default_factory=list)
+    statuses: List[str] = field(default_factory=list)
+    priorities: List[str] = field(default_factory=list)
+    deadlines: List[Optional[str]] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def append(self, title: str, status: str, priority: str, deadline: Optional[str]):
+        self.titles.append(title)
+        self.statuses.append(status)
+        self.priorities.append(priority)
+        self.deadlines.append(deadline)
+
+    def to_records(self) -> List[Dict]:
+        return [{"title": title, "status": status, "priority": priority, "deadline": deadline}
+                for title, status, priority, deadline in zip(self.titles, self.statuses, self.priorities, self.deadlines)]
+
+
+@dataclass(slots=True)
+class CompressedContext:
+    """Token-limited context for the LLM, stored column-wise.
+
+    Sections are only turned back into lists of dicts at the serialization
+    boundary: `get()`/`[]` keep the dict-style interface reason_and_act uses.
+    """
+    memories: MemoryColumns = field(default_factory=MemoryColumns)
+    tasks: TaskColumns = field(default_factory=TaskColumns)
+    conversations: List[str] = field(default_factory=list)
+    calendar_events: List[Dict] = field(default_factory=list)
+
+    def get(self, section: str, default=None):
+        value = getattr(self, section, None)
+        if value is None:
+            return default
+        return value.to_records() if isinstance(value, (MemoryColumns, TaskColumns)) else value
+
+    def __getitem__(self, section: str):
+        if section not in self.__slots__:
+            raise KeyError(section)
+        return self.get(section)
+
 
 class ConversationAgent:
     def __init__(self, ai_service: AIService, memory_agent: MemoryAgent, task_agent: TaskAgent,
@@ -39,13 +252,27 @@ class ConversationAgent:
         self.ai = ai_service
         self.memory = memory_agent
         self.tasks = task_agent
-        self.web_search = get_web_search()
         self.vector = vector_processor  # Optional: enables semantic search for context
         self.calendar = calendar_service  # Optional: enables calendar integration
         self.email = email_service  # Optional: enables email drafts
         self.keep = keep_service  # Optional: enables Google Keep notes
         self.sheets_client = sheets_client
 
+        # Keyword-fallback CSR token index per user: user_id -> (Memories etag, memory count, index)
+        self._keyword_csr: Dict[str, tuple] = {}
+
+        # Per-user semantic memory indexes (user_id -> MemoryIndex), loaded lazily
+        self._memory_indexes: Dict[str, MemoryIndex] = {}
+
+        # LLM intent classifications keyed by a hash of the normalized message
+        self._intent_cache = LRU(512)
+
+        # Conversation-state LLM results keyed by the recent messages they were computed from
+        self._state_cache = LRU(256)
+
+        # Recent read-only responses keyed by query embedding (needs vector_processor)
+        self._response_cache = SemanticResponseCache(max_entries=512, threshold=0.9, ttl_seconds=600)
+
         # Determine whether to use the new multi-stage pipeline
         # Can be set via environment variable or constructor argument
         if use_pipeline is None:
@@ -75,172 +302,232 @@ class ConversationAgent:
             if use_pipeline and not PIPELINE_AVAILABLE:
                 print("[ConversationAgent] Pipeline requested but not available (import failed)")
 
-    def _compress_context(self, context: Dict, user_message: str) -> Dict:
-        """Compress context to fit within token limits using semantic relevance"""
-        compressed = {
-            "memories": [],
-            "tasks": [],
-            "conversations": [],
-            "calendar_events": []
-        }
-        
-        # Get upcoming calendar events if calendar is available and query seems relevant
-        calendar_keywords = ['calendar', 'event', 'schedule', 'scheduled', 'meeting', 'appointment', 'busy', 'free', 'today', 'tomorrow', 'this week', 'next week', 'week']
-        user_lower = user_message.lower()
-        print(f"[DEBUG] Calendar check - user_lower: '{user_lower}'")
-        print(f"[DEBUG] Calendar service available: {self.calendar is not None}")
-        if self.calendar and any(kw in user_lower for kw in calendar_keywords):
-            try:
-                import asyncio
-                import nest_asyncio
-                import pytz
-                from datetime import datetime, timedelta
-                nest_asyncio.apply()
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                try:
-                    brisbane_tz = pytz.timezone('Australia/Brisbane')
-                    now = datetime.now(brisbane_tz)
-
-                    # Determine date range based on query
-                    if 'tomorrow' in user_lower:
-                        target_date = now + timedelta(days=1)
-                        events = loop.run_until_complete(self.calendar.get_events_for_date(target_date))
-                        date_label = target_date.strftime('%A, %B %d')
-                    elif 'today' in user_lower:
-                        events = loop.run_until_complete(self.calendar.get_events_for_date(now))
-                        date_label = "today"
-                    else:
-                        # General calendar query - get next 7 days
-                        events = loop.run_until_complete(self.calendar.get_upcoming_events(max_results=10, days_ahead=7))
-                        date_label = "next 7 days"
-
-                    # Filter out daily recurring events (like Panchang, Yoga Nidra, Gratitude)
-                    daily_recurring_keywords = ['panchang', 'yoga nidra', 'gratitude', 'meditation', 'daily']
-                    filtered_events = []
-                    for event in events:
-                        title_lower = event.get('summary', '').lower()
-                        # Skip if it matches daily recurring keywords
-                        if any(kw in title_lower for kw in daily_recurring_keywords):
-                            continue
-                        filtered_events.append(event)
-
-                    print(f"[DEBUG] Calendar events fetched: {len(events) if events else 0} total, {len(filtered_events)} after filtering daily recurring")
-                    if filtered_events:
-                        for event in filtered_events:
-                            start_str = event.get('start', '')
-                            # Format time nicely
-                            try:
-                                if 'T' in start_str:
-                                    dt = datetime.fromisoformat(start_str.replace('Z', '+00:00'))
-                                    time_display = dt.strftime('%I:%M%p on %a %b %d')
-                                else:
-                                    time_display = f"All day on {start_str}"
-                            except:
-                                time_display = start_str
-
-                            compressed["calendar_events"].append({
-                                "title": event.get('summary', 'Untitled')[:100],
-                                "time": time_display,
-                                "location": event.get('location', '')[:50] if event.get('location') else None
-                            })
-                            print(f"[DEBUG] Added calendar event: {event.get('summary', 'Untitled')} at {time_display}")
-                    else:
-                        # Explicitly note no events for the queried period
-                        compressed["calendar_events"].append({
-                            "note": f"No events scheduled for {date_label}"
-                        })
-                        print(f"[DEBUG] No events - added note: No events scheduled for {date_label}")
-                finally:
-                    loop.close()
-            except Exception as e:
-                print(f"Error getting calendar events: {e}")
-        
-        # Get relevant memories using semantic search if available
-        memories = context.get('memories', [])
-        if memories:
-            if self.vector and len(memories) > MAX_MEMORIES:
-                # Use semantic search for better relevance (async handled via sync wrapper)
+    @cached_property
+    def web_search(self):
+        """Web search tool, created on first use rather than at construction"""
+        return get_web_search()
+
+    def _get_memory_index(self, user_id: str) -> MemoryIndex:
+        """Get (or load) the persistent semantic memory index for a user"""
+        index = self._memory_indexes.get(user_id)
+        if index is None:
+            path = os.path.join(MEMORY_INDEX_DIR, f"{user_id}.npz")
+            index = MemoryIndex(self.vector, path)
+            self._memory_indexes[user_id] = index
+        return index
+
+    async def _fetch_calendar_context(self, feats: MsgFeatures) -> List[Dict]:
+        """Fetch and format calendar events when the message is about the calendar"""
+        calendar_events = []
+        if not (self.calendar and 'calendar' in feats.intents):
+            return calendar_events
+        user_lower = feats.lower
+
+        try:
+            now = datetime.now(BRISBANE_TZ)
+
+            # Determine date range based on query
+            if 'tomorrow' in user_lower:
+                target_date = now + timedelta(days=1)
+                events = await self.calendar.get_events_for_date(target_date)
+                date_label = target_date.strftime('%A, %B %d')
+            elif 'today' in user_lower:
+                events = await self.calendar.get_events_for_date(now)
+                date_label = "today"
+            else:
+                # General calendar query - get next 7 days
+                events = await self.calendar.get_upcoming_events(max_results=10, days_ahead=7)
+                date_label = "next 7 days"
+
+            # Filter out daily recurring events (like Panchang, Yoga Nidra, Gratitude)
+            filtered_events = [
+                event for event in events
+                if 'daily_recurring' not in INTENT_AUTOMATON.categories(event.get('summary', '').lower())
+            ]
+
+            logger.debug("Calendar events fetched: %d total, %d after filtering daily recurring",
+                         len(events or ()), len(filtered_events))
+            if filtered_events:
+                # Canonical start times never raise, so guard the loop once rather than per event
                 try:
-                    import asyncio
-                    import nest_asyncio
-                    nest_asyncio.apply()
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    try:
-                        relevant = loop.run_until_complete(
-                            self.vector.search_similar(user_message, memories, limit=MAX_MEMORIES, threshold=0.2)
-                        )
-                        for mem in relevant:
-                            compressed["memories"].append({
-                                "key": mem.get('key', '')[:50],
-                                "value": str(mem.get('value', ''))[:MAX_VALUE_LENGTH],
-                                "category": mem.get('category', 'knowledge'),
-                                "relevance": round(mem.get('similarity_score', 0), 2)
-                            })
-                    finally:
-                        loop.close()
+                    for event in filtered_events:
+                        self._append_calendar_event(calendar_events, event, _format_event_time(event.get('start', '')))
                 except Exception as e:
-                    print(f"Semantic search failed, falling back to keyword: {e}")
-                    # Fall through to keyword matching
-                    
-            # Fallback: keyword matching if no vector processor or semantic search failed
-            if not compressed["memories"]:
-                user_words = set(user_message.lower().split())
-                scored_memories = []
-                for mem in memories:
-                    value = str(mem.get('value', '')).lower()
-                    key = str(mem.get('key', '')).lower()
-                    mem_words = set(value.split() + key.split())
-                    overlap = len(user_words & mem_words)
-                    scored_memories.append((overlap, mem))
-                
-                scored_memories.sort(key=lambda x: x[0], reverse=True)
-                for _, mem in scored_memories[:MAX_MEMORIES]:
-                    compressed["memories"].append({
-                        "key": mem.get('key', '')[:50],
-                        "value": str(mem.get('value', ''))[:MAX_VALUE_LENGTH],
-                        "category": mem.get('category', 'knowledge')
-                    })
-        
+                    logger.debug("Event time formatting failed, using raw start times: %s", e)
+                    for event in filtered_events[len(calendar_events):]:
+                        start_str = event.get('start', '')
+                        try:
+                            time_display = _format_event_time(start_str)
+                        except Exception:
+                            time_display = start_str
+                        self._append_calendar_event(calendar_events, event, time_display)
+            else:
+                # Explicitly note no events for the queried period
+                calendar_events.append({
+                    "note": f"No events scheduled for {date_label}"
+                })
+                logger.debug("No events - added note: No events scheduled for %s", date_label)
+        except Exception as e:
+            logger.exception("Error getting calendar events: %s", e)
+
+        return calendar_events
+
+    @staticmethod
+    def _append_calendar_event(calendar_events: List[Dict], event: Dict, time_display: str):
+        calendar_events.append({
+            "title": _trunc(event.get('summary', 'Untitled'), 100),
+            "time": time_display,
+            "location": _trunc(event['location'], 50) if event.get('location') else None
+        })
+        logger.debug("Added calendar event: %s at %s", event.get('summary', 'Untitled'), time_display)
+
+    async def _select_memories(self, memories: List[Dict], user_message: str, user_id: Optional[str],
+                               feats: MsgFeatures) -> MemoryColumns:
+        """Pick the memories most relevant to the message, semantically when possible"""
+        if not memories:
+            return MemoryColumns()
+        selected = MemoryColumns()
+        if self.vector and len(memories) > MAX_MEMORIES:
+            # Use semantic search for better relevance
+            try:
+                if user_id:
+                    # Embedding and index search are CPU-bound - keep them off the event loop
+                    # so they overlap the (blocking) calendar fetch
+                    relevant = await asyncio.to_thread(self._search_memory_index, user_id, memories, user_message)
+                else:
+                    relevant = await self.vector.search_similar(user_message, memories, limit=MAX_MEMORIES, threshold=0.2)
+                for mem in relevant:
+                    selected.append(
+                        _trunc(mem.get('key', ''), 50),
+                        _trunc(mem.get('value', ''), MAX_VALUE_LENGTH),
+                        mem.get('category', 'knowledge'),
+                        round(mem.get('similarity_score', 0), 2)
+                    )
+            except Exception as e:
+                logger.warning("Semantic search failed, falling back to keyword: %s", e)
+                # Fall through to keyword matching
+
+        # Fallback: keyword matching if no vector processor or semantic search failed
+        if not selected:
+            for mem in self._score_memories_keyword(feats, memories, user_id):
+                selected.append(
+                    _trunc(mem.get('key', ''), 50),
+                    _trunc(mem.get('value', ''), MAX_VALUE_LENGTH),
+                    mem.get('category', 'knowledge')
+                )
+        return selected
+
+    def _search_memory_index(self, user_id: str, memories: List[Dict], user_message: str) -> List[Dict]:
+        index = self._get_memory_index(user_id)
+        index.sync(memories)
+        return index.search(user_message, limit=MAX_MEMORIES, threshold=0.2)
+
+    async def _compress_context(self, context: Dict, user_message: str, user_id: Optional[str] = None) -> CompressedContext:
+        """Compress context to fit within token limits using semantic relevance"""
+        compressed = CompressedContext()
+
+        # Get upcoming calendar events if calendar is available and query seems relevant
+        feats = MsgFeatures.from_message(user_message)
+        logger.debug("Calendar check - user_lower: %r, calendar service available: %s",
+                     feats.lower, self.calendar is not None)
+
+        # Calendar fetch and memory search are independent - run them concurrently
+        compressed.calendar_events, compressed.memories = await asyncio.gather(
+            self._fetch_calendar_context(feats),
+            self._select_memories(context.get('memories', []), user_message, user_id, feats)
+        )
+
         # Determine if this is a task discussion (use more context) or normal request
-        is_task_discussion = any(kw in user_lower for kw in TASK_DISCUSSION_KEYWORDS)
+        is_task_discussion = self._is_task_discussion(feats)
         max_tasks = MAX_TASKS_DISCUSSION if is_task_discussion else MAX_TASKS_DEFAULT
         max_conversations = MAX_CONVERSATIONS_DISCUSSION if is_task_discussion else MAX_CONVERSATIONS_DEFAULT
 
         if is_task_discussion:
-            print(f"[DEBUG] Task discussion detected - using expanded context (up to {max_tasks} tasks)")
+            logger.debug("Task discussion detected - using expanded context (up to %d tasks)", max_tasks)
 
         # Get relevant tasks (prioritize pending and high priority)
         tasks = context.get('tasks', [])
         if tasks:
-            # Sort: pending first, then by priority
-            priority_order = {'critical': 0, 'high': 1, 'medium': 2, 'low': 3}
-            sorted_tasks = sorted(tasks, key=lambda t: (
-                0 if t.get('status') == 'pending' else 1,
-                priority_order.get(t.get('priority', 'medium'), 2)
-            ))
-            for task in sorted_tasks[:max_tasks]:
-                compressed["tasks"].append({
-                    "title": task.get('title', '')[:100],
-                    "status": task.get('status', 'pending'),
-                    "priority": task.get('priority', 'medium'),
-                    "deadline": task.get('deadline', '')[:20] if task.get('deadline') else None
-                })
+            # Pending first, then by priority - only the top max_tasks are needed
+            for task in self._top_tasks(tasks, max_tasks):
+                compressed.tasks.append(
+                    _trunc(task.get('title', ''), 100),
+                    task.get('status', 'pending'),
+                    task.get('priority', 'medium'),
+                    _trunc(task['deadline'], 20) if task.get('deadline') else None
+                )
 
         # Get recent conversations - format as clear dialogue for multi-turn understanding
         conversations = context.get('conversations', [])
         if conversations:
-            recent_convs = conversations[-max_conversations:]
-            for conv in recent_convs:
-                msg_type = conv.get('message_type', 'user')
-                content = str(conv.get('content', ''))[:200]
+            # Index the tail directly: no slice copy, and O(1) per item for both lists and deques
+            for i in range(max(0, len(conversations) - max_conversations), len(conversations)):
+                conv = conversations[i]
+                content = _trunc(conv.get('content', ''), 200)
                 # Format as clear dialogue: "User: ..." or "Assistant: ..."
-                speaker = "User" if msg_type == 'user' else "Assistant"
-                compressed["conversations"].append(f"{speaker}: {content}")
-        
+                compressed.conversations.append(_SPEAKER_PREFIX.get(conv.get('message_type', 'user'), 'Assistant: ') + content)
+
         return compressed
 
+    def _memory_token_index(self, memories: List[Dict], user_id: Optional[str] = None):
+        """Build (or reuse) a CSR token index over memories: (vocab, indptr, indices).
+
+        Row i holds the unique token ids of memory i's key and value. The index is
+        kept per user for as long as the Memories sheet etag is unchanged, since the
+        context lists are rebuilt from the sheet on every message.
+        """
+        etag = None
+        if user_id and self.sheets_client is not None and hasattr(self.sheets_client, 'get_sheet_etag'):
+            etag = self.sheets_client.get_sheet_etag("Memories")
+            cached = self._keyword_csr.get(user_id)
+            if cached is not None and cached[0] == etag and cached[1] == len(memories):
+                return cached[2]
+
+        vocab: Dict[str, int] = {}
+        indptr = [0]
+        indices = []
+        for mem in memories:
+            value = str(mem.get('value', '')).lower()
+            key = str(mem.get('key', '')).lower()
+            indices.extend({vocab.setdefault(tok, len(vocab)) for tok in value.split() + key.split()})
+            indptr.append(len(indices))
+
+        index = (vocab, np.asarray(indptr, dtype=np.int64), np.asarray(indices, dtype=np.int64))
+        if etag is not None:
+            self._keyword_csr[user_id] = (etag, len(memories), index)
+        return index
+
+    @staticmethod
+    def _top_tasks(tasks: List[Dict], limit: int) -> List[Dict]:
+        """Pending first, then by priority; ties keep list order"""
+        if len(tasks) <= limit:
+            return sorted(tasks, key=_task_sort_key)
+        not_pending = np.fromiter((task.get('status') != 'pending' for task in tasks), dtype=np.uint8, count=len(tasks))
+        priority = np.fromiter((PRIORITY_ORDER.get(task.get('priority', 'medium'), 2) for task in tasks),
+                               dtype=np.uint8, count=len(tasks))
+        keys = pack_task_keys(not_pending, priority)
+        return [tasks[i] for i in np.argsort(keys, kind='stable')[:limit]]
+
+    @staticmethod
+    def _is_task_discussion(feats: MsgFeatures) -> bool:
+        return 'task_discussion' in feats.intents
+
+    def _score_memories_keyword(self, feats: MsgFeatures, memories: List[Dict],
+                                user_id: Optional[str] = None) -> List[Dict]:
+        """Rank memories by word overlap with the message, returning the top MAX_MEMORIES"""
+        vocab, indptr, indices = self._memory_token_index(memories, user_id)
+        scores = np.zeros(len(memories), dtype=np.int64)
+
+        query_ids = [vocab[w] for w in feats.tokens if w in vocab]
+        if query_ids:
+            query = np.zeros(len(vocab), dtype=np.int64)
+            query[query_ids] = 1
+            scores = overlap_scores(query, indptr, indices)
+
+        # Stable so ties keep their original order, as the old list sort did
+        top = np.argsort(-scores, kind='stable')[:MAX_MEMORIES]
+        return [memories[i] for i in top]
+
     async def handle_conversation_flow(self, user_id: str, user_message: str, context: Dict):
         """Manage conversation flow and determine next actions.
 
@@ -297,12 +584,42 @@ class ConversationAgent:
     async def _handle_legacy_flow(self, user_id: str, user_message: str, context: Dict) -> str:
         """Legacy monolithic conversation handling."""
         try:
-            # COMPRESS context to fit within token limits
-            compressed_context = self._compress_context(context, user_message)
-            print(f"Compressed context: {len(compressed_context['memories'])} memories, {len(compressed_context['tasks'])} tasks")
+            # Near-duplicate of a recent read-only question on unchanged data: reuse that answer
+            query_vec = None
+            data_version = self._data_version()
+            if (self.vector and data_version is not None and len(user_message.split()) >= CACHE_MIN_WORDS
+                    and not TIME_DEPENDENT_PATTERN.search(user_message)):
+                # Embedding runs the model - keep it off the event loop
+                query_vec = await asyncio.to_thread(self.vector.get_embedding, user_message)
+                cached = self._response_cache.lookup(user_id, query_vec, data_version)
+                if cached:
+                    logger.debug("Semantic cache hit - skipping LLM")
+                    return cached
 
-            # Get AI analysis of the user input with compressed context
-            analysis = await self.ai.reason_and_act(compressed_context, user_message)
+            # COMPRESS context to fit within token limits
+            compressed_context = await self._compress_context(context, user_message, user_id)
+            logger.debug("Compressed context: %d memories, %d tasks",
+                         len(compressed_context.memories), len(compressed_context.tasks))
+
+            # Get AI analysis of the user input with compressed context. Actions only run once the
+            # whole reply has parsed, and only as parsed - a streamed action may yet be revised or
+            # belong to a reply that fails to parse. While the rest of the reply streams in, the
+            # embeddings that streamed memory actions will search with are computed (cache only).
+            analysis = {}
+            warmups = []
+            async for key, item in self.ai.reason_and_act_stream(compressed_context, user_message):
+                if key is None:
+                    analysis = item
+                elif key == 'memory_actions' and self.vector and isinstance(item, dict):
+                    for text in (item.get('value'), item.get('find_by')):
+                        if text:
+                            warmups.append(asyncio.create_task(asyncio.to_thread(self.vector.get_embedding, str(text))))
+            if warmups:
+                await asyncio.gather(*warmups, return_exceptions=True)
+
+            # Anything that changes the user's data makes cached answers stale
+            if any(analysis.get(k) for k in ACTION_KEYS) or analysis.get('personal_info_extracted'):
+                self._response_cache.invalidate(user_id)
 
             # ALWAYS execute memory actions first, regardless of gaps
             for memory_action in analysis.get('memory_actions', []):
@@ -311,6 +628,7 @@ class ConversationAgent:
             # Store any extracted personal information as memories
             personal_info = analysis.get('personal_info_extracted', [])
             if personal_info:
+                items = []
                 # Create a comprehensive memory about the user's business/role
                 business_keywords = ['company', 'business', 'health', 'radiology', 'role', 'work', 'job', 'run', 'own', 'manage']
                 business_info = [info for info in personal_info if any(keyword in info.lower() for keyword in business_keywords)]
@@ -319,49 +637,40 @@ class ConversationAgent:
                     # Generate a unique key based on the content
                     key_base = business_info[0].lower().replace(' ', '_')[:30]
                     business_memory = f"The user is involved with {', '.join(business_info)}. Context: {user_message[:150]}..."
-                    await self._execute_memory_action(user_id, {
-                        'action': 'store',
+                    items.append({
                         'category': 'work',
                         'key': f'business_{key_base}',
                         'value': business_memory
                     })
 
                 # Store all extracted facts as separate memories
-                for i, info_item in enumerate(personal_info):
+                for info_item in personal_info:
                     # Create a safe key from the info item
                     safe_key = info_item.lower().replace(' ', '_').replace("'", "")[:40]
-                    await self._execute_memory_action(user_id, {
-                        'action': 'store',
+                    items.append({
                         'category': 'knowledge',
                         'key': f'fact_{safe_key}',
                         'value': info_item
                     })
 
+                # One write for all extracted facts instead of one round trip each
+                for result in await self.memory.bulk_store_memories(user_id, items):
+                    logger.debug("Memory store result: %s", result)
+
             # Execute task actions
             for task_action in analysis.get('task_actions', []):
                 await self._execute_task_action(user_id, task_action)
             
-            # Execute calendar actions
-            for calendar_action in analysis.get('calendar_actions', []):
-                result = await self._execute_calendar_action(calendar_action)
-                if result:
-                    # Append calendar result to response if not already mentioned
-                    current_response = analysis.get('response', '')
-                    if result not in current_response:
-                        analysis['response'] = f"{current_response}\n\n{result}"
-
-            # Execute email actions
-            for email_action in analysis.get('email_actions', []):
-                result = await self._execute_email_action(email_action)
-                if result:
-                    current_response = analysis.get('response', '')
-                    if result not in current_response:
-                        analysis['response'] = f"{current_response}\n\n{result}"
-
-            # Execute Keep actions
-            for keep_action in analysis.get('keep_actions', []):
-                result = await self._execute_keep_action(keep_action)
+            # Calendar, email and Keep talk to independent services - run them concurrently,
+            # then append results to the response in their original order
+            external_results = await asyncio.gather(
+                *(self._execute_calendar_action(a) for a in analysis.get('calendar_actions', [])),
+                *(self._execute_email_action(a) for a in analysis.get('email_actions', [])),
+                *(self._execute_keep_action(a) for a in analysis.get('keep_actions', []))
+            )
+            for result in external_results:
                 if result:
+                    # Append result to response if not already mentioned
                     current_response = analysis.get('response', '')
                     if result not in current_response:
                         analysis['response'] = f"{current_response}\n\n{result}"
@@ -369,7 +678,7 @@ class ConversationAgent:
             # Handle follow-up answers (e.g., user providing end date for recurring task)
             if analysis.get('intent') == 'followup_answer':
                 followup_context = analysis.get('followup_context') or ''
-                print(f"Follow-up answer detected: {followup_context}")
+                logger.debug("Follow-up answer detected: %s", followup_context)
 
                 # If this is an end date answer for a recurring task, update the most recent recurring task
                 if followup_context and ('end' in followup_context.lower() or 'recurrence' in followup_context.lower()):
@@ -386,7 +695,7 @@ class ConversationAgent:
             search_results = None
             if web_search_request and web_search_request.get('needed'):
                 search_query = web_search_request.get('query', user_message)
-                print(f"Executing web search: {search_query}")
+                logger.debug("Executing web search: %s", search_query)
                 search_results = await self.web_search.search_with_scraping(search_query, num_results=5)
                 
                 if search_results:
@@ -426,6 +735,8 @@ class ConversationAgent:
             if not response or response.strip() == '':
                 # If AI returned empty response, provide something useful
                 response = "I received your message but I'm not sure how to help. Could you give me more details?"
+            elif query_vec is not None and search_results is None and self._is_cacheable(analysis, user_message):
+                self._response_cache.add(user_id, query_vec, response, data_version)
             return response
 
         except Exception as e:
@@ -434,6 +745,27 @@ class ConversationAgent:
             traceback.print_exc()
             return "Sorry, I ran into a problem processing that. Could you try rephrasing?"
 
+    def _is_cacheable(self, analysis: Dict, user_message: str) -> bool:
+        """Only pure reads are safe to replay; short follow-ups ("yes", "that one") depend on context"""
+        if analysis.get('intent') not in CACHEABLE_INTENTS:
+            return False
+        if any(analysis.get(k) for k in ACTION_KEYS) or analysis.get('personal_info_extracted'):
+            return False
+        if TIME_DEPENDENT_PATTERN.search(analysis.get('response', '')):
+            return False
+        return len(user_message.split()) >= CACHE_MIN_WORDS
+
+    def _data_version(self):
+        """Change tokens of the sheets cached answers are built from, or None if they can't be tracked.
+
+        Task and memory writes from anywhere in this process (bot buttons, the
+        pipeline, background memory writes) change them at once; edits from
+        other processes (web config UI) within SHEET_ETAG_TTL_SECONDS.
+        """
+        if self.sheets_client is None or not hasattr(self.sheets_client, 'get_sheet_etag'):
+            return None
+        return (self.sheets_client.get_sheet_etag("Tasks"), self.sheets_client.get_sheet_etag("Memories"))
+
     async def _execute_memory_action(self, user_id: str, action: Dict):
         """Execute memory-related actions including updates"""
         try:
@@ -552,25 +884,19 @@ class ConversationAgent:
         try:
             tasks = await self.tasks.get_prioritized_tasks(user_id, limit=50, status='all')
             search_lower = search_term.lower()
-            
-            # First, try exact match
-            for task in tasks:
-                if task.get('title', '').lower() == search_lower:
-                    return task.get('task_id')
-            
-            # Then try partial match
-            for task in tasks:
-                if search_lower in task.get('title', '').lower():
-                    return task.get('task_id')
-            
-            # Finally, try word-by-word match
-            search_words = search_lower.split()
+            search_words = search_lower.split()[:3]  # Word match uses the first 3 words
+
+            # Single pass: exact match wins outright, then first substring match, then first all-words match
+            best_score, best_id = 0, None
             for task in tasks:
                 title_lower = task.get('title', '').lower()
-                if all(word in title_lower for word in search_words[:3]):  # Match first 3 words
+                if title_lower == search_lower:
                     return task.get('task_id')
-            
-            return None
+                if best_score < 2:
+                    score = 2 if search_lower in title_lower else (1 if all(word in title_lower for word in search_words) else 0)
+                    if score > best_score:
+                        best_score, best_id = score, task.get('task_id')
+            return best_id
         except Exception as e:
             print(f"Error finding task by title: {e}")
             return None
@@ -634,104 +960,191 @@ class ConversationAgent:
 
         return None
 
+    async def _email_create_draft(self, action: Dict) -> str:
+        to = action.get('to', '')
+        subject = action.get('subject', '')
+        body = action.get('body', '')
+
+        if not to:
+            return "Need a recipient to create a draft."
+        if not subject and not body:
+            return "Need a subject or body for the email."
+
+        result = await self.email.create_draft(to, subject, body)
+        if result:
+            return f"Draft created: '{subject}' to {result.get('to')}"
+        return "Failed to create draft. Check if contact exists."
+
+    async def _email_reply(self, action: Dict) -> str:
+        # Reply to an existing email thread
+        sender_name = action.get('sender_name', '')
+        body = action.get('body', '')
+
+        if not sender_name:
+            return "Need the sender's name to find the email to reply to."
+        if not body:
+            return "Need a message body for the reply."
+
+        # Find the original email from this sender (search last 30 emails)
+        original_email = await self.email.find_email_from_sender(sender_name, max_results=30)
+        if not original_email:
+            return f"Could not find a recent email from '{sender_name}' in your inbox."
+
+        # Create the reply draft
+        result = await self.email.create_reply_draft(original_email, body)
+        if result:
+            return f"Reply draft created to {result.get('to')} - Re: {original_email.get('subject', 'No subject')}"
+        return "Failed to create reply draft."
+
+    async def _email_get_recent(self, action: Dict) -> str:
+        max_emails = action.get('max_results', 10)
+        emails = await self.email.get_recent_emails(max_results=max_emails)
+        if emails:
+            return "Recent emails:\n" + "\n".join(
+                f"- From: {e.get('from_name', 'Unknown')} ({e.get('from_email', '')})\n"
+                f"  Subject: {e.get('subject', 'No subject')}\n"
+                f"  Snippet: {e.get('snippet', '')[:100]}..."
+                for e in emails[:10]
+            )
+        return "No recent emails found."
+
+    async def _email_send(self, action: Dict) -> str:
+        to = action.get('to', '')
+        subject = action.get('subject', '')
+        body = action.get('body', '')
+
+        if not to or not subject or not body:
+            return "Need recipient, subject, and body to send email."
+
+        result = await self.email.send_email(to, subject, body)
+        if result:
+            return f"Email sent to {result.get('to')}"
+        return "Failed to send email."
+
+    async def _email_add_contact(self, action: Dict) -> str:
+        name = action.get('name', '')
+        email_addr = action.get('email', '')
+
+        if not name or not email_addr:
+            return "Need both name and email to add a contact."
+
+        self.email.add_contact(name, email_addr)
+        return f"Contact added: {name} -> {email_addr}"
+
+    async def _email_list_contacts(self, action: Dict) -> str:
+        contacts = self.email.list_contacts()
+        if contacts:
+            contact_list = "\n".join(f"- {name}: {email}" for name, email in contacts.items())
+            return f"Your contacts:\n{contact_list}"
+        return "No contacts saved yet."
+
+    async def _email_list_drafts(self, action: Dict) -> str:
+        drafts = await self.email.list_drafts(max_results=5)
+        if drafts:
+            draft_list = "\n".join(f"- {d['subject']} (to: {d['to']})" for d in drafts)
+            return f"Your drafts:\n{draft_list}"
+        return "No drafts found."
+
+    # action name -> handler, looked up once per email action
+    _EMAIL_HANDLERS = {
+        'create_draft': _email_create_draft,
+        'reply_to_email': _email_reply,
+        'get_recent_emails': _email_get_recent,
+        'send_email': _email_send,
+        'add_contact': _email_add_contact,
+        'list_contacts': _email_list_contacts,
+        'list_drafts': _email_list_drafts,
+    }
+
     async def _execute_email_action(self, action: Dict) -> Optional[str]:
         """Execute email-related actions (create draft, send, add contact, reply)"""
         if not self.email:
             return "Email not configured. Add GMAIL_ADDRESS and GMAIL_APP_PASSWORD to .env"
 
         try:
-            action_type = action.get('action')
-
-            if action_type == 'create_draft':
-                to = action.get('to', '')
-                subject = action.get('subject', '')
-                body = action.get('body', '')
-
-                if not to:
-                    return "Need a recipient to create a draft."
-                if not subject and not body:
-                    return "Need a subject or body for the email."
-
-                result = await self.email.create_draft(to, subject, body)
-                if result:
-                    return f"Draft created: '{subject}' to {result.get('to')}"
-                return "Failed to create draft. Check if contact exists."
-
-            elif action_type == 'reply_to_email':
-                # Reply to an existing email thread
-                sender_name = action.get('sender_name', '')
-                body = action.get('body', '')
-
-                if not sender_name:
-                    return "Need the sender's name to find the email to reply to."
-                if not body:
-                    return "Need a message body for the reply."
-
-                # Find the original email from this sender (search last 30 emails)
-                original_email = await self.email.find_email_from_sender(sender_name, max_results=30)
-                if not original_email:
-                    return f"Could not find a recent email from '{sender_name}' in your inbox."
-
-                # Create the reply draft
-                result = await self.email.create_reply_draft(original_email, body)
-                if result:
-                    return f"Reply draft created to {result.get('to')} - Re: {original_email.get('subject', 'No subject')}"
-                return "Failed to create reply draft."
-
-            elif action_type == 'get_recent_emails':
-                max_emails = action.get('max_results', 10)
-                emails = await self.email.get_recent_emails(max_results=max_emails)
-                if emails:
-                    email_list = []
-                    for e in emails[:10]:
-                        email_list.append(f"- From: {e.get('from_name', 'Unknown')} ({e.get('from_email', '')})")
-                        email_list.append(f"  Subject: {e.get('subject', 'No subject')}")
-                        email_list.append(f"  Snippet: {e.get('snippet', '')[:100]}...")
-                    return "Recent emails:\n" + "\n".join(email_list)
-                return "No recent emails found."
-
-            elif action_type == 'send_email':
-                to = action.get('to', '')
-                subject = action.get('subject', '')
-                body = action.get('body', '')
-
-                if not to or not subject or not body:
-                    return "Need recipient, subject, and body to send email."
-
-                result = await self.email.send_email(to, subject, body)
-                if result:
-                    return f"Email sent to {result.get('to')}"
-                return "Failed to send email."
-
-            elif action_type == 'add_contact':
-                name = action.get('name', '')
-                email_addr = action.get('email', '')
-
-                if not name or not email_addr:
-                    return "Need both name and email to add a contact."
-
-                self.email.add_contact(name, email_addr)
-                return f"Contact added: {name} -> {email_addr}"
-
-            elif action_type == 'list_contacts':
-                contacts = self.email.list_contacts()
-                if contacts:
-                    contact_list = "\n".join([f"- {name}: {email}" for name, email in contacts.items()])
-                    return f"Your contacts:\n{contact_list}"
-                return "No contacts saved yet."
-
-            elif action_type == 'list_drafts':
-                drafts = await self.email.list_drafts(max_results=5)
-                if drafts:
-                    draft_list = "\n".join([f"- {d['subject']} (to: {d['to']})" for d in drafts])
-                    return f"Your drafts:\n{draft_list}"
-                return "No drafts found."
-
+            handler = self._EMAIL_HANDLERS.get(action.get('action'))
+            if handler is None:
+                return None
+            return await handler(self, action)
         except Exception as e:
             print(f"Error executing email action: {e}")
             return f"Email error: {str(e)}"
 
-        return None
+    async def _keep_list_notes(self, action: Dict) -> str:
+        max_notes = action.get('max_results', 10)
+        notes = await self.keep.list_notes(max_results=max_notes)
+        if notes:
+            return "Your Keep notes:\n" + "\n".join(
+                f"- {n.get('title', '(Untitled)')}{' [pinned]' if n.get('pinned') else ''}"
+                for n in notes[:10]
+            )
+        return "No notes found in Google Keep."
+
+    async def _keep_search_notes(self, action: Dict) -> str:
+        query = action.get('query', '')
+        if not query:
+            return "Need a search term to find notes."
+
+        notes = await self.keep.search_notes(query, max_results=5)
+        if notes:
+            return f"Notes matching '{query}':\n" + "\n".join(f"- {n.get('title', '(Untitled)')}" for n in notes)
+        return f"No notes found matching '{query}'."
+
+    async def _keep_add_to_note(self, action: Dict) -> str:
+        # Add text to an existing note
+        note_title = action.get('note_title', '')
+        text_to_add = action.get('text', '')
+
+        if not note_title:
+            return "Need a note title to add to."
+        if not text_to_add:
+            return "Need text to add to the note."
+
+        # Find the note by title
+        note = await self.keep.find_note_by_title(note_title)
+        if not note:
+            return f"Could not find a note matching '{note_title}'. Try listing your notes first."
+
+        # Add the text to the note
+        result = await self.keep.add_to_note(note['id'], text_to_add, position='top')
+        if result:
+            return f"Added to '{note['title']}':\n\"{text_to_add}\"\n\nWould you like to add more details?"
+        return "Failed to add to note."
+
+    async def _keep_create_note(self, action: Dict) -> str:
+        title = action.get('title', '')
+        text = action.get('text', '')
+        pinned = action.get('pinned', False)
+
+        if not title:
+            return "Need a title to create a note."
+
+        result = await self.keep.create_note(title, text, pinned)
+        if result:
+            return f"Created note: '{title}'"
+        return "Failed to create note."
+
+    async def _keep_get_note(self, action: Dict) -> str:
+        note_title = action.get('note_title', '')
+        if not note_title:
+            return "Need a note title to view."
+
+        note = await self.keep.find_note_by_title(note_title)
+        if note:
+            text_preview = note.get('text', '')[:500]
+            if len(note.get('text', '')) > 500:
+                text_preview += '...'
+            return f"Note: {note['title']}\n\n{text_preview}"
+        return f"Could not find a note matching '{note_title}'."
+
+    # action name -> handler, looked up once per Keep action
+    _KEEP_HANDLERS = {
+        'list_notes': _keep_list_notes,
+        'search_notes': _keep_search_notes,
+        'add_to_note': _keep_add_to_note,
+        'create_note': _keep_create_note,
+        'get_note': _keep_get_note,
+    }
 
     async def _execute_keep_action(self, action: Dict) -> Optional[str]:
         """Execute Google Keep actions (list notes, add to note, create note)"""
@@ -739,106 +1152,28 @@ class ConversationAgent:
             return "Google Keep not configured. Add GOOGLE_KEEP_TOKEN to .env"
 
         try:
-            action_type = action.get('action')
-
-            if action_type == 'list_notes':
-                max_notes = action.get('max_results', 10)
-                notes = await self.keep.list_notes(max_results=max_notes)
-                if notes:
-                    note_list = []
-                    for n in notes[:10]:
-                        title = n.get('title', '(Untitled)')
-                        pinned = ' [pinned]' if n.get('pinned') else ''
-                        note_list.append(f"- {title}{pinned}")
-                    return "Your Keep notes:\n" + "\n".join(note_list)
-                return "No notes found in Google Keep."
-
-            elif action_type == 'search_notes':
-                query = action.get('query', '')
-                if not query:
-                    return "Need a search term to find notes."
-
-                notes = await self.keep.search_notes(query, max_results=5)
-                if notes:
-                    note_list = []
-                    for n in notes:
-                        title = n.get('title', '(Untitled)')
-                        note_list.append(f"- {title}")
-                    return f"Notes matching '{query}':\n" + "\n".join(note_list)
-                return f"No notes found matching '{query}'."
-
-            elif action_type == 'add_to_note':
-                # Add text to an existing note
-                note_title = action.get('note_title', '')
-                text_to_add = action.get('text', '')
-
-                if not note_title:
-                    return "Need a note title to add to."
-                if not text_to_add:
-                    return "Need text to add to the note."
-
-                # Find the note by title
-                note = await self.keep.find_note_by_title(note_title)
-                if not note:
-                    return f"Could not find a note matching '{note_title}'. Try listing your notes first."
-
-                # Add the text to the note
-                result = await self.keep.add_to_note(note['id'], text_to_add, position='top')
-                if result:
-                    return f"Added to '{note['title']}':\n\"{text_to_add}\"\n\nWould you like to add more details?"
-                return "Failed to add to note."
-
-            elif action_type == 'create_note':
-                title = action.get('title', '')
-                text = action.get('text', '')
-                pinned = action.get('pinned', False)
-
-                if not title:
-                    return "Need a title to create a note."
-
-                result = await self.keep.create_note(title, text, pinned)
-                if result:
-                    return f"Created note: '{title}'"
-                return "Failed to create note."
-
-            elif action_type == 'get_note':
-                note_title = action.get('note_title', '')
-                if not note_title:
-                    return "Need a note title to view."
-
-                note = await self.keep.find_note_by_title(note_title)
-                if note:
-                    text_preview = note.get('text', '')[:500]
-                    if len(note.get('text', '')) > 500:
-                        text_preview += '...'
-                    return f"Note: {note['title']}\n\n{text_preview}"
-                return f"Could not find a note matching '{note_title}'."
-
+            handler = self._KEEP_HANDLERS.get(action.get('action'))
+            if handler is None:
+                return None
+            return await handler(self, action)
         except Exception as e:
             print(f"Error executing Keep action: {e}")
             return f"Keep error: {str(e)}"
 
-        return None
-
     async def _update_recent_recurring_task_end_date(self, user_id: str, end_date: str):
         """Find the most recently created recurring task and update its end date"""
         try:
             tasks = await self.tasks.get_prioritized_tasks(user_id, limit=20, status='all')
             
-            # Find recurring tasks without an end date, sorted by creation time (most recent first)
-            recurring_tasks = [
-                t for t in tasks 
-                if str(t.get('is_recurring', 'false')).lower() == 'true'
-                and not t.get('recurrence_end_date')
-            ]
-            
-            if recurring_tasks:
-                # Sort by created_at descending to get most recent
-                recurring_tasks.sort(
-                    key=lambda t: t.get('created_at', ''), 
-                    reverse=True
-                )
-                task_to_update = recurring_tasks[0]
+            # Most recently created recurring task without an end date (first one wins on ties)
+            task_to_update = max(
+                (t for t in tasks
+                 if str(t.get('is_recurring', 'false')).lower() == 'true' and not t.get('recurrence_end_date')),
+                key=lambda t: t.get('created_at', ''),
+                default=None
+            )
+
+            if task_to_update is not None:
                 task_id = task_to_update.get('task_id')
                 
                 if task_id:
@@ -856,11 +1191,19 @@ class ConversationAgent:
 
     async def detect_conversation_intent(self, user_message: str, context: Dict) -> str:
         """Detect the primary intent of the user's message"""
+        # Low-temperature classification of the same message gives the same intent; the
+        # recent context only nudges it, so it is left out of the key
+        cache_key = hashlib.blake2b(user_message.strip().lower().encode(), digest_size=16).hexdigest()
+        cached = self._intent_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         prompt = f"""
         Analyze this user message and determine the primary intent:
 
         Message: "{user_message}"
-        Recent context: {json.dumps(context.get('conversations', [])[-3:])}
+        Recent context:
+{_format_recent(context.get('conversations', []))}
 
         Possible intents:
         - task_creation: User wants to create a task or to-do
@@ -875,13 +1218,18 @@ class ConversationAgent:
         """
 
         try:
-            response = await self.ai.client.chat.completions.create(
+            # Intent names are a few tokens long, so cap generation there and stop at the first line.
+            # The Groq client is synchronous - run the request off the event loop
+            response = await asyncio.to_thread(
+                self.ai.client.chat.completions.create,
                 model=self.ai.model,
                 messages=[{"role": "user", "content": prompt}],
-                max_tokens=20,
-                temperature=0.1
+                max_tokens=INTENT_MAX_TOKENS,
+                temperature=0.1,
+                stop=["\n"]
             )
             intent = response.choices[0].message.content.strip().lower()
+            self._intent_cache[cache_key] = intent
             return intent
         except Exception as e:
             print(f"Error detecting intent: {e}")
@@ -890,13 +1238,17 @@ class ConversationAgent:
     async def generate_proactive_response(self, user_id: str, context: Dict) -> str:
         """Generate proactive suggestions based on user context"""
         try:
+            # Overdue and high-priority lookups are independent - fetch both at once
+            overdue, pending = await asyncio.gather(
+                self.tasks.get_overdue_tasks(user_id),
+                self.tasks.get_prioritized_tasks(user_id, limit=3)
+            )
+
             # Check for overdue tasks
-            overdue = await self.tasks.get_overdue_tasks(user_id)
             if overdue:
                 return f"⚠️ You have {len(overdue)} overdue task(s). Would you like me to show them to you?"
 
             # Check for high-priority pending tasks
-            pending = await self.tasks.get_prioritized_tasks(user_id, limit=3)
             high_priority = [t for t in pending if t.get('priority') == 'high']
             if high_priority:
                 return f"🔥 You have {len(high_priority)} high-priority task(s) pending. Need help with them?"
@@ -918,21 +1270,27 @@ class ConversationAgent:
             return False
 
         # Check for goodbye keywords in recent messages
-        recent_messages = [msg.get('content', '').lower() for msg in conversation_history[-3:]]
-        goodbye_keywords = ['bye', 'goodbye', 'see you', 'thanks', 'thank you', 'that\'s all', 'done']
-
-        for msg in recent_messages:
-            if any(keyword in msg for keyword in goodbye_keywords):
+        for msg in conversation_history[-3:]:
+            if _GOODBYE_RE.search(msg.get('content', '')):
                 return True
 
-        # Check conversation state
-        state = await self.ai.detect_conversation_state(conversation_history)
+        # Short conversations are rarely wrapping up - not worth an LLM call
+        if len(conversation_history) < STATE_CHECK_MIN_TURNS:
+            return False
+
+        # Check conversation state (memoized on the messages the state prompt actually sees)
+        state_key = hash(tuple((m.get('message_type'), m.get('content', '')) for m in conversation_history[-10:]))
+        state = self._state_cache.get(state_key)
+        if state is None:
+            state = await self.ai.detect_conversation_state(conversation_history)
+            self._state_cache[state_key] = state
         return state == 'completing'
 
-    async def summarize_conversation(self, conversation_history: List[Dict]) -> str:
-        """Generate a summary of the conversation"""
+    async def summarize_conversation_stream(self, conversation_history: List[Dict]):
+        """Stream a summary of the conversation, yielding text as the LLM produces it"""
         if not conversation_history:
-            return "No conversation to summarize."
+            yield "No conversation to summarize."
+            return
 
         history_text = "\n".join([
             f"{'User' if msg.get('message_type') == 'user' else 'Assistant'}: {msg.get('content', '')}"
@@ -947,14 +1305,31 @@ class ConversationAgent:
         Provide a brief summary of what was discussed and any actions taken:
         """
 
+        emitted = False
         try:
-            response = await self.ai.client.chat.completions.create(
+            # The Groq client is synchronous - open the stream and pull each chunk off the event loop
+            stream = await asyncio.to_thread(
+                self.ai.client.chat.completions.create,
                 model=self.ai.model,
                 messages=[{"role": "user", "content": prompt}],
                 max_tokens=150,
-                temperature=0.3
+                temperature=0.3,
+                stream=True
             )
-            return response.choices[0].message.content.strip()
+            while True:
+                chunk = await asyncio.to_thread(next, stream, None)
+                if chunk is None:
+                    break
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    emitted = True
+                    yield delta
         except Exception as e:
             print(f"Error summarizing conversation: {e}")
-            return "Conversation summary unavailable."
\ No newline at end of file
+            if not emitted:
+                yield "Conversation summary unavailable."
+
+    async def summarize_conversation(self, conversation_history: List[Dict]) -> str:
+        """Generate a summary of the conversation"""
+        parts = [part async for part in self.summarize_conversation_stream(conversation_history)]
+        return "".join(parts).strip()
\ No newline at end of file
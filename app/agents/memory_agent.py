@@ -1,72 +1,256 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+import asyncio
+import hashlib
 import json
 from datetime import datetime
+import numpy as np
+from lru import LRU
 from app.database.sheets_client import SheetsClient
+from app.database.write_behind import WriteBehindQueue
 from app.utils.vector_processor import VectorProcessor
 from app.services.ai_service import AIService
 
+# At or above this similarity a new memory restates an existing one - no merge needed
+MEMORY_DUPLICATE_THRESHOLD = 0.95
+
+
+def _set_text(column: np.ndarray, position: int, text: str) -> np.ndarray:
+    """Copy of a fixed-width string array with one entry replaced (widened if needed)"""
+    text = np.array(text)
+    column = column.astype(np.promote_types(column.dtype, text.dtype))
+    column[position] = text
+    return column
+
+
 class MemoryAgent:
     def __init__(self, sheets_client: SheetsClient, vector_processor: VectorProcessor, ai_service: AIService):
         self.sheets = sheets_client
         self.vector = vector_processor
         self.ai = ai_service
 
-    async def store_memory(self, user_id: str, category: str, key: str, value: str) -> str:
-        """Store new memory with semantic embedding and conflict resolution"""
-        try:
-            # Check for similar existing memories
-            memories_df = await self.sheets.get_sheet_data("Memories", user_id)
-            memories = memories_df.to_dict('records') if not memories_df.empty else []
-
-            similar = await self.vector.search_similar(value, memories, user_id, limit=3, threshold=0.7)
-
-            if similar:
-                # High similarity - merge with existing
-                existing_key = similar[0]['key']
-                existing_value = similar[0]['value']
-                merged_value = await self.ai.merge_memories(existing_value, value)
-
-                # Find and update the existing row
-                row_index = await self.sheets.find_row_by_id("Memories", user_id, existing_key)
-                if row_index:
-                    embedding = await self.vector.generate_memory_embedding(category, existing_key, merged_value)
-                    await self.sheets.update_row("Memories", row_index, {
-                        "value": merged_value,
-                        "embedding": embedding,
-                        "timestamp": datetime.now().isoformat(),
-                        "confidence": min(float(similar[0].get('confidence', 1.0)) + 0.1, 1.0)
-                    })
-                    return f"Memory merged with existing: {existing_key}"
-
-            # Store as new memory
+        # user_id -> (sheet etag, (N, D) normalized embeddings, memory dicts without embeddings,
+        #             lowercased keys, lowercased values)
+        self._memory_cache: Dict[str, Tuple[Any, np.ndarray, List[Dict], np.ndarray, np.ndarray]] = {}
+
+        # blake2b(category|key|value) -> serialized embedding, so rewrites of the same content skip the model
+        self._embed_cache = LRU(1024)
+
+        # blake2b(normalized information) -> categorize_information result
+        self._categorize_cache = LRU(1024)
+
+        # Memories writes go out in the background; _memory_cache is patched right away instead
+        self._writes = WriteBehindQueue(sheets_client)
+
+    async def flush(self) -> List[str]:
+        """Wait until all queued memory writes have been sent (call before shutdown).
+
+        Returns the writes that failed since the last flush - store_memory and
+        friends report success once a write is queued, before it is sent.
+        """
+        return await self._writes.flush()
+
+    @staticmethod
+    def _with_memory(matrix: np.ndarray, meta: List[Dict], memory: Dict, embedding: str,
+                     position: Optional[int] = None) -> Optional[Tuple[np.ndarray, List[Dict]]]:
+        """Copies of (matrix, meta) with memory appended, or merged into row `position`.
+
+        Copies rather than mutates, since callers may still hold the previous
+        matrix/meta. None if the embedding doesn't fit the matrix.
+        """
+        vec = np.asarray(json.loads(embedding), dtype=np.float32)
+        if vec.shape[0] != matrix.shape[1]:
+            return None
+        norm = np.linalg.norm(vec)
+        if norm > 0:
+            vec /= norm
+        memory = {k: v for k, v in memory.items() if k != 'embedding'}
+
+        if position is None:
+            return np.vstack((matrix, vec.astype(matrix.dtype)[None, :])), meta + [memory]
+        matrix = matrix.copy()
+        matrix[position] = vec
+        meta = meta.copy()
+        meta[position] = {**meta[position], **memory}
+        return matrix, meta
+
+    def _cache_memory(self, user_id: str, memory: Dict, embedding: str, new: bool = False):
+        """Put a just-written memory into the cached matrix so reads see it before the sheet does"""
+        cached = self._memory_cache.get(user_id)
+        if cached is None:
+            return
+        etag, matrix, meta, keys_lower, values_lower = cached
+        position = None if new else next((i for i, m in enumerate(meta) if m.get('key') == memory.get('key')), None)
+        updated = self._with_memory(matrix, meta, memory, embedding, position)
+        if updated is None:
+            self._memory_cache.pop(user_id, None)
+            return
+        matrix, meta = updated
+
+        if position is None:
+            keys_lower = np.append(keys_lower, str(memory.get('key', '')).lower())
+            values_lower = np.append(values_lower, str(memory.get('value', '')).lower())
+        else:
+            keys_lower = _set_text(keys_lower, position, str(meta[position].get('key', '')).lower())
+            values_lower = _set_text(values_lower, position, str(meta[position].get('value', '')).lower())
+        self._memory_cache[user_id] = (etag, matrix, meta, keys_lower, values_lower)
+
+    async def _memory_embedding(self, category: str, key: str, value: str) -> str:
+        content_hash = hashlib.blake2b(f"{category}|{key}|{value}".encode(), digest_size=16).digest()
+        embedding = self._embed_cache.get(content_hash)
+        if embedding is None:
             embedding = await self.vector.generate_memory_embedding(category, key, value)
+            self._embed_cache[content_hash] = embedding
+        return embedding
 
-            await self.sheets.append_row("Memories", {
-                "user_id": user_id,
-                "category": category,
-                "key": key,
-                "value": value,
-                "embedding": embedding,
-                "timestamp": datetime.now().isoformat(),
-                "confidence": 1.0,
-                "tags": json.dumps([])
-            })
+    async def _load_memories(self, user_id: str) -> Tuple[np.ndarray, List[Dict], np.ndarray, np.ndarray, bool]:
+        """User's memories as an embedding matrix plus metadata, rebuilt only when the sheet changes.
+
+        Also returns the lowercased keys and values for substring lookups. The
+        flag is True when the data was just fetched, i.e. each memory's
+        `_row_index` is known to be current.
+        """
+        etag = self.sheets.get_sheet_etag("Memories") if hasattr(self.sheets, 'get_sheet_etag') else None
+        cached = self._memory_cache.get(user_id)
+        if cached is not None and etag is not None and cached[0] == etag:
+            return cached[1], cached[2], cached[3], cached[4], False
+
+        # Reloading from the sheet - make sure it has everything we've queued
+        await self._writes.wait()
+        memories_df = await self.sheets.get_sheet_data("Memories", user_id, with_row_index=True)
+        memories = memories_df.to_dict('records') if not memories_df.empty else []
+        matrix = self.vector.build_embedding_matrix(memories)
+        meta = [{k: v for k, v in mem.items() if k != 'embedding'} for mem in memories]
+        keys_lower = np.array([str(mem.get('key', '')).lower() for mem in meta], dtype=str)
+        values_lower = np.array([str(mem.get('value', '')).lower() for mem in meta], dtype=str)
+        if etag is not None:
+            self._memory_cache[user_id] = (etag, matrix, meta, keys_lower, values_lower)
+        return matrix, meta, keys_lower, values_lower, True
+
+    async def _memory_row(self, user_id: str, memory: Dict, fresh: bool) -> Optional[int]:
+        """Sheet row of a loaded memory; cached rows may have shifted (external deletes), so look those up"""
+        if fresh and memory.get('_row_index'):
+            return int(memory['_row_index'])
+        await self._writes.wait()  # the memory itself may still be queued
+        return await self.sheets.find_row_by_id("Memories", user_id, memory['key'])
+
+    async def _store_one(self, user_id: str, matrix: np.ndarray, memories: List[Dict], fresh: bool,
+                         category: str, key: str, value: str,
+                         now_iso: str) -> Tuple[str, np.ndarray, List[Dict]]:
+        """Store one memory against the loaded (matrix, memories) snapshot.
+
+        Returns the result message and the snapshot with the stored or merged
+        memory applied, so callers storing several can check each against the
+        ones before it.
+        """
+        # Repeat of a known value (e.g. the same information under its content-hash key) - nothing
+        # to embed or write. Checked on the text, since stored embeddings also cover category and key
+        normalized = str(value).strip().lower()
+        repeat = next((m for m in memories if str(m.get('value', '')).strip().lower() == normalized), None)
+        if repeat is not None:
+            return f"Memory already known: {repeat.get('key', key)}", matrix, memories
+
+        # Check for similar existing memories
+        similar = self.vector.search_similar_matrix(value, matrix, memories, limit=3, threshold=0.7)
+        if similar:
+            # High similarity - merge with existing
+            existing_key = similar[0]['key']
+            if similar[0]['similarity_score'] >= MEMORY_DUPLICATE_THRESHOLD:
+                return f"Memory already known: {existing_key}", matrix, memories
+            existing_value = similar[0]['value']
+            merged_value = await self.ai.merge_memories(existing_value, value)
+            if merged_value == existing_value:
+                # Nothing new to add - skip the embedding and the write
+                return f"Memory already up to date: {existing_key}", matrix, memories
+
+            # Find the existing row while embedding the merged value (no data dependency)
+            row_index, embedding = await asyncio.gather(
+                self._memory_row(user_id, similar[0], fresh),
+                self._memory_embedding(category, existing_key, merged_value)
+            )
+            if row_index:
+                update = {
+                    "value": merged_value,
+                    "embedding": embedding,
+                    "timestamp": now_iso,
+                    "confidence": min(float(similar[0].get('confidence', 1.0)) + 0.1, 1.0)
+                }
+                self._writes.update("Memories", row_index, update)
+                self._cache_memory(user_id, {"key": existing_key, **update}, embedding)
+                position = next((i for i, m in enumerate(memories) if m.get('key') == existing_key), None)
+                if position is not None:
+                    updated = self._with_memory(matrix, memories, update, embedding, position)
+                    if updated is not None:
+                        matrix, memories = updated
+                return f"Memory merged with existing: {existing_key}", matrix, memories
+
+        # Store as new memory
+        embedding = await self._memory_embedding(category, key, value)
 
-            return f"New memory stored: {key}"
+        row = {
+            "user_id": user_id,
+            "category": category,
+            "key": key,
+            "value": value,
+            "embedding": embedding,
+            "timestamp": now_iso,
+            "confidence": 1.0,
+            "tags": json.dumps([])
+        }
+        self._writes.append("Memories", row)
+        self._cache_memory(user_id, row, embedding, new=True)
+        updated = self._with_memory(matrix, memories, row, embedding)
+        if updated is not None:
+            matrix, memories = updated
+        return f"New memory stored: {key}", matrix, memories
+
+    async def store_memory(self, user_id: str, category: str, key: str, value: str) -> str:
+        """Store new memory with semantic embedding and conflict resolution"""
+        try:
+            matrix, memories, _, _, fresh = await self._load_memories(user_id)
+            result, _, _ = await self._store_one(user_id, matrix, memories, fresh, category, key, value,
+                                                 datetime.now().isoformat())
+            return result
 
         except Exception as e:
             print(f"Error storing memory: {e}")
             return f"Error storing memory: {str(e)}"
 
-    async def retrieve_memories(self, user_id: str, query: str, category: str = None, limit: int = 5) -> List[Dict]:
-        """Retrieve semantically similar memories"""
+    async def bulk_store_memories(self, user_id: str, items: List[Dict[str, str]]) -> List[str]:
+        """Store several memories, appending all new ones in a single write.
+
+        Each item is {"category", "key", "value"}. Similar existing memories are
+        merged exactly as in store_memory; new rows are queued together, so the
+        background writer sends them in one append_rows call. Items are also
+        checked against the ones stored or merged before them in the batch, as
+        separate store_memory calls would.
+        """
+        if not items:
+            return []
+
+        results = []
         try:
-            memories_df = await self.sheets.get_sheet_data("Memories", user_id)
-            memories = memories_df.to_dict('records') if not memories_df.empty else []
+            now_iso = datetime.now().isoformat()
+            matrix, memories, _, _, fresh = await self._load_memories(user_id)
+
+            for item in items:
+                result, matrix, memories = await self._store_one(
+                    user_id, matrix, memories, fresh,
+                    item.get('category', 'knowledge'), item['key'], item.get('value', ''), now_iso
+                )
+                results.append(result)
 
-            results = await self.vector.search_similar(query, memories, user_id, category, limit, threshold=0.3)
             return results
 
+        except Exception as e:
+            print(f"Error bulk storing memories: {e}")
+            return results + [f"Error storing memory: {str(e)}"]
+
+    async def retrieve_memories(self, user_id: str, query: str, category: str = None, limit: int = 5) -> List[Dict]:
+        """Retrieve semantically similar memories"""
+        try:
+            matrix, memories, _, _, _ = await self._load_memories(user_id)
+            return self.vector.search_similar_matrix(query, matrix, memories, category, limit, threshold=0.3)
+
         except Exception as e:
             print(f"Error retrieving memories: {e}")
             return []
@@ -74,47 +258,45 @@ class MemoryAgent:
     async def update_memory(self, user_id: str, key: str, new_value: str) -> str:
         """Update existing memory by key or partial key match"""
         try:
-            # Get all memories for this user
-            memories_df = await self.sheets.get_sheet_data("Memories", user_id)
-            if memories_df.empty:
+            now_iso = datetime.now().isoformat()
+
+            # Cached memories (including queued writes) with their lowercased keys/values
+            _, memories, keys_lower, values_lower, fresh = await self._load_memories(user_id)
+            if not memories:
                 return f"Memory not found: {key}"
 
-            # Try exact key match first
-            existing = memories_df[memories_df['key'] == key]
-            
-            # If no exact match, try partial match
-            if existing.empty:
-                key_lower = key.lower()
-                for idx, row in memories_df.iterrows():
-                    if key_lower in str(row.get('key', '')).lower():
-                        existing = memories_df.iloc[[idx]]
-                        key = row.get('key')  # Use the actual key
-                        break
-            
-            # If still no match, try searching by value content
-            if existing.empty:
-                for idx, row in memories_df.iterrows():
-                    if key.lower() in str(row.get('value', '')).lower():
-                        existing = memories_df.iloc[[idx]]
-                        key = row.get('key')
+            # Exact key match first, then partial key match, then value content - first hit wins
+            key_lower = key.lower()
+            position = next((i for i, m in enumerate(memories) if m.get('key') == key), None)
+            if position is None:
+                for column in (keys_lower, values_lower):
+                    hits = np.flatnonzero(np.char.find(column, key_lower) >= 0)
+                    if hits.size:
+                        position = int(hits[0])
                         break
-            
-            if existing.empty:
+
+            if position is None:
                 return f"Memory not found: {key}"
 
-            # Find the actual row in the sheet
-            row_index = await self.sheets.find_row_by_id("Memories", user_id, key)
+            existing = memories[position]
+            key = existing['key']  # Use the actual key
+            if str(existing['value']) == new_value:
+                return f"Memory already up to date: {key}"
+
+            row_index = await self._memory_row(user_id, existing, fresh)
             if not row_index:
                 return f"Memory not found (row lookup failed): {key}"
 
-            category = existing.iloc[0]['category']
-            embedding = await self.vector.generate_memory_embedding(category, key, new_value)
+            category = existing['category']
+            embedding = await self._memory_embedding(category, key, new_value)
 
-            await self.sheets.update_row("Memories", row_index, {
+            update = {
                 "value": new_value,
                 "embedding": embedding,
-                "timestamp": datetime.now().isoformat()
-            })
+                "timestamp": now_iso
+            }
+            self._writes.update("Memories", row_index, update)
+            self._cache_memory(user_id, {"key": key, **update}, embedding)
 
             return f"Memory updated: {key}"
 
@@ -125,32 +307,36 @@ class MemoryAgent:
     async def delete_memory(self, user_id: str, key: str) -> str:
         """Delete a memory (move to archive)"""
         try:
-            memories_df = await self.sheets.get_sheet_data("Memories", user_id)
+            now_iso = datetime.now().isoformat()
+            await self._writes.wait()
+            memories_df = await self.sheets.get_sheet_data("Memories", user_id, with_row_index=True)
             if memories_df.empty:
                 return f"Memory not found: {key}"
 
-            memory = memories_df[memories_df['key'] == key]
-            if memory.empty:
+            mask = memories_df['key'] == key
+            if not mask.any():
                 return f"Memory not found: {key}"
 
             # Move to archive
-            memory_data = memory.iloc[0].to_dict()
-            await self.sheets.append_row("Archive", {
+            memory_data = memories_df.loc[mask.idxmax()].to_dict()
+            row_index = int(memory_data.pop('_row_index'))
+            # The embedding can be regenerated from the text - don't archive it
+            memory_data.pop('embedding', None)
+            self._writes.append("Archive", {
                 "user_id": user_id,
                 "original_sheet": "Memories",
-                "content": json.dumps(memory_data),
-                "archived_at": datetime.now().isoformat(),
+                "content": json.dumps(memory_data, separators=(',', ':'), ensure_ascii=False),
+                "archived_at": now_iso,
                 "reason": "deleted_by_user"
             })
 
             # Note: In a real implementation, you'd delete the row
             # For now, we'll just mark it as archived
-            row_index = await self.sheets.find_row_by_id("Memories", user_id, key)
-            if row_index:
-                await self.sheets.update_row("Memories", row_index, {
-                    "value": "[DELETED]",
-                    "timestamp": datetime.now().isoformat()
-                })
+            self._memory_cache.pop(user_id, None)
+            self._writes.update("Memories", row_index, {
+                "value": "[DELETED]",
+                "timestamp": now_iso
+            })
 
             return f"Memory archived: {key}"
 
@@ -170,18 +356,27 @@ class MemoryAgent:
         Return JSON: {{"category": "string", "key": "brief_key_name", "should_store": true/false}}
         """
 
+        # Same information -> same key, so re-sending it doesn't create a new memory
+        content_hash = hashlib.blake2b(information.strip().lower().encode(), digest_size=8).hexdigest()
+        cached = self._categorize_cache.get(content_hash)
+        if cached is not None:
+            return dict(cached)
+
         try:
             # This would use the AI service
             # For now, return defaults
-            return {
+            result = {
                 "category": "knowledge",
-                "key": f"info_{int(datetime.now().timestamp())}",
+                "key": f"info_{content_hash}",
                 "should_store": True
             }
         except Exception as e:
             print(f"Error categorizing information: {e}")
             return {
                 "category": "knowledge",
-                "key": f"info_{int(datetime.now().timestamp())}",
+                "key": f"info_{content_hash}",
                 "should_store": True
-            }
\ No newline at end of file
+            }
+
+        self._categorize_cache[content_hash] = result
+        return dict(result)
@@ -1,19 +1,92 @@
 from datetime import datetime, timedelta
+from functools import lru_cache
 from dateutil import parser as date_parser
 from dateutil.relativedelta import relativedelta
 from typing import List, Dict, Any, Optional
 import uuid
-import json
 import re
+import numpy as np
+import pandas as pd
 import pytz
 from app.database.sheets_client import SheetsClient
 from app.services.ai_service import AIService
 from app.services.scheduler_service import SchedulerService
 
+# orjson is optional - faster decoding of archived task JSON, stdlib json otherwise
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
 # Brisbane timezone
 BRISBANE_TZ = pytz.timezone('Australia/Brisbane')
 
+# Day names in recurrence patterns -> weekday numbers (Monday=0)
+_WEEKDAYS = {"monday": 0, "tuesday": 1, "wednesday": 2, "thursday": 3,
+             "friday": 4, "saturday": 5, "sunday": 6}
+
+# Relative day phrases in a natural language deadline, found in one scan
+_BASE_DATE_RE = re.compile(r'tomorrow|today|next week|next month', re.IGNORECASE)
+
+# Time in a natural language deadline (e.g., "9pm", "9:00 AM", "21:00")
+_TIME_RE = re.compile(r'(\d{1,2}):?(\d{2})?\s*(am|pm)?', re.IGNORECASE)
+
+# Sort rank and check-in score per priority
+_PRIORITY_ORDER = {'high': 0, 'medium': 1, 'low': 2}
+_PRIORITY_SCORE = {'high': 30, 'medium': 20, 'low': 10}
+
+# Jitter source for check-in rotation, created once
+_CHECKIN_RNG = np.random.default_rng()
+
+
+def _fast_parse(value: str, **kwargs) -> datetime:
+    """Parse a date string, using the stdlib for ISO input and dateutil only for anything else"""
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return date_parser.parse(value, **kwargs)
+
+
+@lru_cache(maxsize=4096)
+def _parse_iso_cached(value: str) -> datetime:
+    """Timezone-aware datetime for a stored ISO timestamp (naive ones are Brisbane time).
+
+    Task rows keep the same deadline/completed_at/last_discussed strings between
+    reads, so repeated parses are cache hits.
+    """
+    dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return BRISBANE_TZ.localize(dt) if dt.tzinfo is None else dt
+
+
+def _epoch_seconds(column: Optional[pd.Series], length: int) -> np.ndarray:
+    """POSIX timestamps for a column of stored ISO strings; NaN where empty or unparsable.
+
+    Each distinct string is parsed once.
+    """
+    result = np.full(length, np.nan)
+    if column is None:
+        return result
+    codes, uniques = pd.factorize(column)
+    parsed = np.full(len(uniques), np.nan)
+    for i, value in enumerate(uniques):
+        if value:
+            try:
+                parsed[i] = _parse_iso_cached(value).timestamp()
+            except (AttributeError, TypeError, ValueError):
+                pass
+    present = codes >= 0
+    result[present] = parsed[codes[present]]
+    return result
+
+
 class TaskAgent:
+    # Fields every new task starts with; create_task copies this and fills in the rest
+    _TASK_DEFAULTS = {
+        "status": "pending",
+        "dependencies": "[]",
+        "notes": "",
+    }
+
     def __init__(self, sheets_client: SheetsClient, scheduler: SchedulerService, ai_service: AIService):
         self.sheets = sheets_client
         self.scheduler = scheduler
@@ -29,7 +102,7 @@ class TaskAgent:
             parsed_deadline = None
             if deadline:
                 try:
-                    parsed_deadline = date_parser.parse(deadline)
+                    parsed_deadline = _fast_parse(deadline)
                 except:
                     # Use AI to parse natural language dates
                     parsed_deadline = await self._parse_deadline_with_ai(deadline)
@@ -43,29 +116,28 @@ class TaskAgent:
                 priority = await self.ai.determine_task_priority(title, description or "", deadline)
 
             # Generate unique task ID
+            now_iso = datetime.now().isoformat()
             task_id = f"task_{user_id}_{uuid.uuid4().hex[:8]}"
 
             # Parse recurrence end date if provided
             parsed_recurrence_end = None
             if recurrence_end_date:
                 try:
-                    parsed_recurrence_end = date_parser.parse(recurrence_end_date)
+                    parsed_recurrence_end = _fast_parse(recurrence_end_date)
                 except:
                     parsed_recurrence_end = await self._parse_deadline_with_ai(recurrence_end_date)
 
             task_data = {
+                **self._TASK_DEFAULTS,
                 "user_id": user_id,
                 "task_id": task_id,
                 "title": title,
                 "description": description or "",
                 "priority": priority,
-                "status": "pending",
                 "deadline": parsed_deadline.isoformat() if parsed_deadline else None,
-                "created_at": datetime.now().isoformat(),
-                "updated_at": datetime.now().isoformat(),
-                "dependencies": "[]",
-                "notes": "",
-                "is_recurring": str(is_recurring).lower(),
+                "created_at": now_iso,
+                "updated_at": now_iso,
+                "is_recurring": "true" if is_recurring else "false",
                 "recurrence_pattern": recurrence_pattern or "",
                 "recurrence_end_date": parsed_recurrence_end.isoformat() if parsed_recurrence_end else "",
                 "parent_task_id": parent_task_id or ""
@@ -106,10 +178,7 @@ class TaskAgent:
                     day_name = parts[1].lower()
                     time_str = parts[2]
                     
-                    # Map day names to weekday numbers (Monday=0)
-                    days = {"monday": 0, "tuesday": 1, "wednesday": 2, "thursday": 3, 
-                            "friday": 4, "saturday": 5, "sunday": 6}
-                    target_day = days.get(day_name, 0)
+                    target_day = _WEEKDAYS.get(day_name, 0)
                     
                     # Parse time
                     hour = int(time_str[:2]) if len(time_str) >= 2 else 9
@@ -173,25 +242,19 @@ class TaskAgent:
     async def complete_task(self, user_id: str, task_id: str) -> str:
         """Mark task complete - will be auto-archived after 7 days"""
         try:
-            # Get task data
-            tasks_df = await self.sheets.get_sheet_data("Tasks", user_id)
-            if tasks_df.empty:
-                return f"Task not found: {task_id}"
-
-            task = tasks_df[tasks_df['task_id'] == task_id]
-            if task.empty:
+            # Get task data and its row in one read
+            row_index, task_data = await self.sheets.find_row_with_data("Tasks", user_id, task_id)
+            if not task_data:
                 return f"Task not found: {task_id}"
 
-            task_data = task.iloc[0].to_dict()
-
             # Update status and set completed_at timestamp
-            row_index = await self.sheets.find_row_by_id("Tasks", user_id, task_id)
             if row_index:
+                now_iso = datetime.now().isoformat()
                 await self.sheets.update_row("Tasks", row_index, {
                     "status": "complete",
                     "progress_percent": "100",
-                    "completed_at": datetime.now().isoformat(),
-                    "updated_at": datetime.now().isoformat()
+                    "completed_at": now_iso,
+                    "updated_at": now_iso
                 })
 
             # Cancel reminder if scheduler is available
@@ -207,28 +270,26 @@ class TaskAgent:
     async def update_task_progress(self, user_id: str, task_id: str, progress: int, notes: str = None) -> str:
         """Update task progress percentage and optional notes"""
         try:
-            row_index = await self.sheets.find_row_by_id("Tasks", user_id, task_id)
+            row_index, task = await self.sheets.find_row_with_data("Tasks", user_id, task_id)
             if not row_index:
                 return f"Task not found: {task_id}"
 
+            now_iso = datetime.now().isoformat()
             update_data = {
                 "progress_percent": str(min(100, max(0, progress))),
-                "last_discussed": datetime.now().isoformat(),
-                "updated_at": datetime.now().isoformat()
+                "last_discussed": now_iso,
+                "updated_at": now_iso
             }
 
             if notes:
                 # Append to existing notes
-                tasks_df = await self.sheets.get_sheet_data("Tasks", user_id)
-                task = tasks_df[tasks_df['task_id'] == task_id]
-                if not task.empty:
-                    existing_notes = task.iloc[0].get('notes', '')
-                    timestamp = datetime.now(BRISBANE_TZ).strftime('%m/%d %H:%M')
-                    new_note = f"[{timestamp}] {notes}"
-                    if existing_notes:
-                        update_data["notes"] = f"{existing_notes}\n{new_note}"
-                    else:
-                        update_data["notes"] = new_note
+                existing_notes = task.get('notes', '')
+                timestamp = datetime.now(BRISBANE_TZ).strftime('%m/%d %H:%M')
+                new_note = f"[{timestamp}] {notes}"
+                if existing_notes:
+                    update_data["notes"] = f"{existing_notes}\n{new_note}"
+                else:
+                    update_data["notes"] = new_note
 
             await self.sheets.update_row("Tasks", row_index, update_data)
 
@@ -249,8 +310,6 @@ class TaskAgent:
         Uses weighted random selection to ensure variety in check-ins.
         """
         try:
-            import random
-
             tasks_df = await self.sheets.get_sheet_data("Tasks", user_id)
             if tasks_df.empty:
                 return []
@@ -260,103 +319,61 @@ class TaskAgent:
             if 'archived' in tasks_df.columns:
                 # Case-insensitive check for archived flag
                 pending_mask &= tasks_df['archived'].astype(str).str.lower() != 'true'
-            tasks = tasks_df[pending_mask].to_dict('records')
+            df = tasks_df[pending_mask]
 
-            if not tasks:
+            if df.empty:
                 return []
 
-            now = datetime.now(BRISBANE_TZ)
+            now_ts = datetime.now(BRISBANE_TZ).timestamp()
 
-            # Score each task for check-in priority
-            scored_tasks = []
-            for task in tasks:
-                # Skip tasks that are temporarily suppressed (skipped_until in the future)
-                skipped_until_str = task.get('skipped_until', '')
-                if skipped_until_str:
-                    try:
-                        skipped_until = datetime.fromisoformat(skipped_until_str.replace('Z', '+00:00'))
-                        if skipped_until.tzinfo is None:
-                            skipped_until = BRISBANE_TZ.localize(skipped_until)
-                        if skipped_until > now:
-                            # Task is still in skip period, exclude it
-                            continue
-                    except:
-                        pass  # Invalid date, ignore the skip
-
-                score = 0
-
-                # Priority weighting: high=30, medium=20, low=10
-                priority = task.get('priority', 'medium')
-                if priority == 'high':
-                    score += 30
-                elif priority == 'medium':
-                    score += 20
-                else:
-                    score += 10
+            # Skip tasks that are temporarily suppressed (skipped_until in the future);
+            # invalid dates don't suppress anything
+            skipped_until = _epoch_seconds(df.get('skipped_until'), len(df))
+            df = df[~(skipped_until > now_ts)]
+            if df.empty:
+                return []
 
-                # Deadline proximity: closer deadline = higher score
-                deadline_str = task.get('deadline')
-                if deadline_str:
-                    try:
-                        deadline = datetime.fromisoformat(deadline_str.replace('Z', '+00:00'))
-                        if deadline.tzinfo is None:
-                            deadline = BRISBANE_TZ.localize(deadline)
-                        days_until = (deadline - now).days
-                        if days_until < 0:
-                            score += 50  # Overdue
-                        elif days_until <= 1:
-                            score += 40  # Due within 24h
-                        elif days_until <= 3:
-                            score += 25  # Due within 3 days
-                        elif days_until <= 7:
-                            score += 15  # Due within a week
-                    except:
-                        pass
-
-                # Progress: lower progress = higher need for check-in
-                progress = int(task.get('progress_percent', '0') or '0')
-                if progress == 0:
-                    score += 20  # Not started
-                elif progress < 50:
-                    score += 15  # Less than halfway
-                elif progress < 80:
-                    score += 10  # Making progress
-
-                # Time since last discussed: longer = higher priority
-                # Also penalize tasks discussed recently (within last few hours)
-                last_discussed = task.get('last_discussed')
-                if last_discussed:
-                    try:
-                        last_dt = datetime.fromisoformat(last_discussed.replace('Z', '+00:00'))
-                        if last_dt.tzinfo is None:
-                            last_dt = BRISBANE_TZ.localize(last_dt)
-                        hours_since = (now - last_dt).total_seconds() / 3600
-                        days_since = hours_since / 24
-
-                        if hours_since < 2:
-                            score -= 30  # Discussed very recently, strong penalty
-                        elif hours_since < 6:
-                            score -= 15  # Discussed within 6 hours, moderate penalty
-                        elif days_since >= 3:
-                            score += 25  # Not discussed in 3+ days
-                        elif days_since >= 1:
-                            score += 15  # Not discussed in 1+ day
-                    except:
-                        score += 20  # Parse error, assume never discussed
-                else:
-                    score += 20  # Never discussed
+            # Score each task for check-in priority, column-wise
+            # Priority weighting: high=30, medium=20, low=10
+            if 'priority' in df.columns:
+                score = df['priority'].map(_PRIORITY_SCORE).fillna(10).to_numpy(dtype=float, copy=True)
+            else:
+                score = np.full(len(df), 20.0)
+
+            # Deadline proximity: closer deadline = higher score (unparsable deadlines score 0)
+            days_until = (_epoch_seconds(df.get('deadline'), len(df)) - now_ts) // 86400
+            score += np.select(
+                [days_until < 0, days_until <= 1, days_until <= 3, days_until <= 7],
+                [50, 40, 25, 15],  # Overdue, due within 24h, within 3 days, within a week
+                default=0
+            )
 
-                # Increased randomness (0-25) for better task rotation
-                score += random.randint(0, 25)
+            # Progress: lower progress = higher need for check-in
+            if 'progress_percent' in df.columns:
+                progress = pd.to_numeric(df['progress_percent'], errors='coerce').fillna(0).to_numpy()
+            else:
+                progress = np.zeros(len(df))
+            score += np.select(
+                [progress == 0, progress < 50, progress < 80],
+                [20, 15, 10],  # Not started, less than halfway, making progress
+                default=0
+            )
 
-                scored_tasks.append((score, task))
+            # Time since last discussed: longer = higher priority
+            # Also penalize tasks discussed recently (within last few hours)
+            hours_since = (now_ts - _epoch_seconds(df.get('last_discussed'), len(df))) / 3600
+            score += np.select(
+                [np.isnan(hours_since), hours_since < 2, hours_since < 6, hours_since >= 72, hours_since >= 24],
+                [20, -30, -15, 25, 15],  # Never discussed (or unparsable), very recent, within 6h, 3+ days, 1+ day
+                default=0
+            )
 
-            if not scored_tasks:
-                return []
+            # Increased randomness (0-25) for better task rotation
+            score += _CHECKIN_RNG.integers(0, 26, size=len(df))
 
-            # Sort by score descending and pick top tasks
-            scored_tasks.sort(key=lambda x: x[0], reverse=True)
-            return [task for _, task in scored_tasks[:limit]]
+            # Highest scores first (ties keep sheet order) and pick top tasks
+            top = np.argsort(-score, kind='stable')[:limit]
+            return df.iloc[top].to_dict('records')
 
         except Exception as e:
             print(f"Error getting tasks for check-in: {e}")
@@ -391,43 +408,32 @@ class TaskAgent:
     async def archive_old_completed_tasks(self, user_id: str, days_threshold: int = 7) -> int:
         """Archive tasks completed more than X days ago"""
         try:
-            tasks_df = await self.sheets.get_sheet_data("Tasks", user_id)
+            tasks_df = await self.sheets.get_sheet_data("Tasks", user_id, with_row_index=True)
             if tasks_df.empty:
                 return 0
 
             now = datetime.now(BRISBANE_TZ)
-            archived_count = 0
 
-            for _, task in tasks_df.iterrows():
-                if task.get('status') != 'complete':
-                    continue
-                if str(task.get('archived', '')).lower() == 'true':
-                    continue
-
-                completed_at = task.get('completed_at')
-                if not completed_at:
-                    continue
+            # Completed, not yet archived, and completed at least days_threshold days ago
+            mask = tasks_df['status'] == 'complete'
+            if 'archived' in tasks_df.columns:
+                mask &= tasks_df['archived'].astype(str).str.lower() != 'true'
+            days_since = np.floor((now.timestamp() - _epoch_seconds(tasks_df.get('completed_at'), len(tasks_df))) / 86400)
+            mask &= days_since >= days_threshold
+            archivable = tasks_df[mask]
+            if archivable.empty:
+                return 0
 
-                try:
-                    completed_dt = datetime.fromisoformat(completed_at.replace('Z', '+00:00'))
-                    if completed_dt.tzinfo is None:
-                        completed_dt = BRISBANE_TZ.localize(completed_dt)
-
-                    days_since = (now - completed_dt).days
-                    if days_since >= days_threshold:
-                        # Mark as archived
-                        row_index = await self.sheets.find_row_by_id("Tasks", user_id, task.get('task_id'))
-                        if row_index:
-                            await self.sheets.update_row("Tasks", row_index, {
-                                "archived": "true",
-                                "updated_at": now.isoformat()
-                            })
-                            archived_count += 1
-                            print(f"Auto-archived task: {task.get('title')}")
-                except:
-                    continue
+            # Rows come with the data - mark them all archived in one write
+            now_iso = now.isoformat()
+            await self.sheets.update_rows("Tasks", [
+                (int(row_index), {"archived": "true", "updated_at": now_iso})
+                for row_index in archivable['_row_index']
+            ])
+            for title in archivable.get('title', []):
+                print(f"Auto-archived task: {title}")
 
-            return archived_count
+            return len(archivable)
 
         except Exception as e:
             print(f"Error archiving old tasks: {e}")
@@ -448,26 +454,27 @@ class TaskAgent:
 
             # Also check the Archive sheet for older tasks
             archive_df = await self.sheets.get_sheet_data("Archive", user_id)
-            if not archive_df.empty:
-                for _, row in archive_df.iterrows():
-                    if row.get('original_sheet') == 'Tasks':
-                        try:
-                            task_data = json.loads(row.get('content', '{}'))
-                            task_data['archived_at'] = row.get('archived_at')
-                            archived.append(task_data)
-                        except:
-                            continue
-
-            # Search
-            search_lower = search_term.lower()
-            matching = []
-            for task in archived:
-                title = task.get('title', '').lower()
-                description = task.get('description', '').lower()
-                notes = task.get('notes', '').lower()
+            if not archive_df.empty and 'original_sheet' in archive_df.columns:
+                for row in archive_df[archive_df['original_sheet'] == 'Tasks'].to_dict('records'):
+                    try:
+                        task_data = _json_loads(row.get('content', '{}'))
+                    except (TypeError, ValueError):
+                        continue
+                    if isinstance(task_data, dict):
+                        task_data['archived_at'] = row.get('archived_at')
+                        archived.append(task_data)
 
-                if search_lower in title or search_lower in description or search_lower in notes:
-                    matching.append(task)
+            if not archived:
+                return []
+
+            # Search title, description and notes column-wise
+            search_lower = search_term.lower()
+            archived_df = pd.DataFrame(archived)
+            mask = np.zeros(len(archived_df), dtype=bool)
+            for column in ('title', 'description', 'notes'):
+                if column in archived_df.columns:
+                    mask |= archived_df[column].fillna('').astype(str).str.lower().str.contains(search_lower, regex=False).to_numpy()
+            matching = [archived[i] for i in np.flatnonzero(mask)]
 
             # Sort by archived_at or completed_at descending
             matching.sort(
@@ -492,25 +499,15 @@ class TaskAgent:
             if status != "all":
                 tasks_df = tasks_df[tasks_df['status'] == status]
 
-            # Convert to list of dicts
-            tasks = tasks_df.to_dict('records')
-
-            # Sort by priority (high > medium > low) then by deadline
-            priority_order = {'high': 0, 'medium': 1, 'low': 2}
-
-            def sort_key(task):
-                priority_val = priority_order.get(task.get('priority', 'medium'), 1)
-                deadline_str = task.get('deadline')
-                deadline_val = float('inf')
-                if deadline_str:
-                    try:
-                        deadline_val = datetime.fromisoformat(deadline_str).timestamp()
-                    except:
-                        pass
-                return (priority_val, deadline_val)
-
-            tasks.sort(key=sort_key)
-            return tasks[:limit]
+            # Sort by priority (high > medium > low) then by deadline; tasks without a
+            # usable deadline go last within their priority, ties keep sheet order
+            if 'priority' in tasks_df.columns:
+                priority_vals = tasks_df['priority'].map(_PRIORITY_ORDER).fillna(1).to_numpy()
+            else:
+                priority_vals = np.ones(len(tasks_df))
+            deadline_vals = np.nan_to_num(_epoch_seconds(tasks_df.get('deadline'), len(tasks_df)), nan=np.inf)
+            order = np.lexsort((deadline_vals, priority_vals))
+            return tasks_df.iloc[order[:limit]].to_dict('records')
 
         except Exception as e:
             print(f"Error getting prioritized tasks: {e}")
@@ -523,23 +520,11 @@ class TaskAgent:
             if tasks_df.empty:
                 return []
 
-            now = datetime.now()
-            overdue_tasks = []
-
-            for _, task in tasks_df.iterrows():
-                if task['status'] != 'pending':
-                    continue
-
-                deadline_str = task.get('deadline')
-                if deadline_str:
-                    try:
-                        deadline = datetime.fromisoformat(deadline_str)
-                        if deadline < now:
-                            overdue_tasks.append(task.to_dict())
-                    except:
-                        continue
-
-            return overdue_tasks
+            # Pending tasks whose deadline has passed (unparsable deadlines never are)
+            now_ts = datetime.now(BRISBANE_TZ).timestamp()
+            deadlines = _epoch_seconds(tasks_df.get('deadline'), len(tasks_df))
+            overdue_mask = (tasks_df['status'] == 'pending') & (deadlines < now_ts)
+            return tasks_df[overdue_mask].to_dict('records')
 
         except Exception as e:
             print(f"Error getting overdue tasks: {e}")
@@ -551,14 +536,14 @@ class TaskAgent:
             # Parse new deadline
             parsed_deadline = None
             try:
-                parsed_deadline = date_parser.parse(new_deadline)
+                parsed_deadline = _fast_parse(new_deadline)
             except:
                 parsed_deadline = await self._parse_deadline_with_ai(new_deadline)
 
             if not parsed_deadline:
                 return "Could not parse deadline"
 
-            row_index = await self.sheets.find_row_by_id("Tasks", user_id, task_id)
+            row_index, task = await self.sheets.find_row_with_data("Tasks", user_id, task_id)
             if not row_index:
                 return f"Task not found: {task_id}"
 
@@ -567,13 +552,9 @@ class TaskAgent:
                 "updated_at": datetime.now().isoformat()
             })
 
-            # Reschedule reminder if scheduler is available
+            # Reschedule reminder if scheduler is available (title from the row read above)
             if self.scheduler:
-                tasks_df = await self.sheets.get_sheet_data("Tasks", user_id)
-                task = tasks_df[tasks_df['task_id'] == task_id]
-                if not task.empty:
-                    title = task.iloc[0]['title']
-                    await self.scheduler.schedule_reminder(user_id, task_id, title, parsed_deadline)
+                await self.scheduler.schedule_reminder(user_id, task_id, task['title'], parsed_deadline)
 
             return f"Task deadline updated: {task_id} → {new_deadline}"
 
@@ -591,7 +572,7 @@ class TaskAgent:
             # Parse date fields if needed
             if field_name in ['recurrence_end_date', 'deadline'] and field_value:
                 try:
-                    parsed_date = date_parser.parse(field_value)
+                    parsed_date = _fast_parse(field_value)
                     if parsed_date.tzinfo is None:
                         parsed_date = BRISBANE_TZ.localize(parsed_date)
                     field_value = parsed_date.isoformat()
@@ -617,23 +598,27 @@ class TaskAgent:
         now = datetime.now(BRISBANE_TZ)
         deadline_text = deadline_text.lower().strip()
 
+        # Nothing date-like to work with - fuzzy parsing of junk can be very slow
+        if not any(c.isalnum() for c in deadline_text):
+            return None
+
         try:
             # Common patterns for natural language dates
-            # "tomorrow", "today", "next week", etc.
-            if 'tomorrow' in deadline_text:
+            # "tomorrow", "today", "next week", etc. - checked in this order if several appear
+            phrases = set(_BASE_DATE_RE.findall(deadline_text))
+            if 'tomorrow' in phrases:
                 base_date = now + timedelta(days=1)
-            elif 'today' in deadline_text:
+            elif 'today' in phrases:
                 base_date = now
-            elif 'next week' in deadline_text:
+            elif 'next week' in phrases:
                 base_date = now + timedelta(weeks=1)
-            elif 'next month' in deadline_text:
+            elif 'next month' in phrases:
                 base_date = now + relativedelta(months=1)
             else:
                 base_date = None
 
             # Extract time if specified (e.g., "9pm", "9:00 AM", "21:00")
-            time_pattern = r'(\d{1,2}):?(\d{2})?\s*(am|pm)?'
-            time_match = re.search(time_pattern, deadline_text, re.IGNORECASE)
+            time_match = _TIME_RE.search(deadline_text)
 
             if time_match:
                 hour = int(time_match.group(1))
@@ -651,7 +636,7 @@ class TaskAgent:
 
             # Try standard date parsing
             try:
-                parsed = date_parser.parse(deadline_text, fuzzy=True, dayfirst=True)
+                parsed = _fast_parse(deadline_text, fuzzy=True, dayfirst=True)
                 # Make timezone aware
                 if parsed.tzinfo is None:
                     parsed = BRISBANE_TZ.localize(parsed)
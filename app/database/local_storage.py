@@ -1,112 +1,253 @@
+import atexit
 import json
 import os
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Union
 import pandas as pd
 from datetime import datetime
 
+# orjson is optional - faster reads/writes of the data files, stdlib json otherwise
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _encode_line(row: Dict[str, Any]) -> bytes:
+    """One record as a JSON Lines line"""
+    if orjson is not None:
+        return orjson.dumps(row) + b'\n'
+    return json.dumps(row, ensure_ascii=False).encode('utf-8') + b'\n'
+
+
 class LocalStorage:
-    """Simple local JSON-based storage as fallback for Google Sheets"""
+    """Simple local JSON-based storage as fallback for Google Sheets.
+
+    Each sheet is a JSON Lines file (one record per line), so appends write a
+    line instead of rewriting the file. Files in the older single-array format
+    are converted on startup.
+    """
 
     def __init__(self, data_dir: str = "data"):
         self.data_dir = data_dir
         os.makedirs(data_dir, exist_ok=True)
 
+        # file path -> unbuffered append handle, opened on first append (see _append_data)
+        self._append_handles: Dict[str, Any] = {}
+        atexit.register(self.close)
+
         # Initialize data files
         self.memories_file = os.path.join(data_dir, "memories.json")
         self.tasks_file = os.path.join(data_dir, "tasks.json")
         self.archive_file = os.path.join(data_dir, "archive.json")
         self.conversations_file = os.path.join(data_dir, "conversations.json")
 
-        # Initialize empty files if they don't exist
-        for file_path in [self.memories_file, self.tasks_file, self.archive_file, self.conversations_file]:
-            if not os.path.exists(file_path):
-                with open(file_path, 'w') as f:
-                    json.dump([], f)
-
-    def _load_data(self, file_path: str) -> List[Dict]:
-        """Load data from JSON file"""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return []
-
-    def _save_data(self, file_path: str, data: List[Dict]):
-        """Save data to JSON file"""
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-
-    async def get_sheet_data(self, sheet_name: str, user_id: Optional[str] = None) -> pd.DataFrame:
-        """Get data from local storage"""
-        file_map = {
+        # Sheet name -> backing file
+        self._file_map = {
             "Memories": self.memories_file,
             "Tasks": self.tasks_file,
             "Archive": self.archive_file,
             "Conversations": self.conversations_file
         }
 
-        if sheet_name not in file_map:
-            return pd.DataFrame()
+        # Initialize empty files if they don't exist, and convert old JSON array files
+        for file_path in self._file_map.values():
+            if not os.path.exists(file_path):
+                open(file_path, 'wb').close()
+            else:
+                with open(file_path, 'rb') as f:
+                    legacy = f.read().lstrip().startswith(b'[')
+                if legacy:
+                    self._save_data(file_path, self._load_data(file_path))
 
-        data = self._load_data(file_map[sheet_name])
+    def _load_data(self, file_path: str) -> List[Dict]:
+        """Load data from JSON Lines file (or an old-format JSON array)"""
+        try:
+            # Read the file in one go and parse the buffer, rather than json.load's streamed reads
+            with open(file_path, 'rb') as f:
+                raw = f.read()
+        except FileNotFoundError:
+            return []
 
-        if not data:
-            return pd.DataFrame()
+        loads = orjson.loads if orjson is not None else json.loads
+        if raw.lstrip().startswith(b'['):
+            try:
+                return loads(raw)
+            except json.JSONDecodeError:
+                return []
 
-        df = pd.DataFrame(data)
+        lines = [line for line in raw.splitlines() if line.strip()]
+        try:
+            # One parser call for the whole file: the lines are the elements of an array
+            return loads(b'[' + b','.join(lines) + b']')
+        except json.JSONDecodeError:
+            pass
+
+        # Some line is damaged - parse them one by one
+        data = []
+        for line in lines:
+            try:
+                data.append(loads(line))
+            except json.JSONDecodeError:
+                # Skip a damaged line (e.g. a write cut short) rather than losing the file
+                print(f"Skipping unreadable line in {file_path}")
+        return data
 
-        if user_id and 'user_id' in df.columns:
-            df = df[df['user_id'] == user_id]
+    def _save_data(self, file_path: str, data: List[Dict]):
+        """Save data to JSON Lines file"""
+        # Encode up front and write once
+        payload = b''.join(_encode_line(row) for row in data)
+        with open(file_path, 'wb') as f:
+            f.write(payload)
+
+    def _append_data(self, file_path: str, rows: List[Dict]):
+        """Append records to JSON Lines file without reading it.
+
+        The file stays open for appending, so each call is a single unbuffered
+        write. O_APPEND writes land at the current end even after _save_data
+        rewrites the file, and nothing is held back that a later read would miss.
+        """
+        payload = b''.join(_encode_line(row) for row in rows)
+        handle = self._append_handles.get(file_path)
+        if handle is None:
+            handle = open(file_path, 'ab', buffering=0)
+            self._append_handles[file_path] = handle
+            # Start on a fresh line if an earlier write was cut short; later
+            # appends and rewrites always end with a newline
+            with open(file_path, 'rb') as f:
+                if f.seek(0, os.SEEK_END) > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b'\n':
+                        payload = b'\n' + payload
+        handle.write(payload)
+
+    def close(self):
+        """Close the append handles"""
+        for handle in self._append_handles.values():
+            handle.close()
+        self._append_handles.clear()
+
+    def get_sheet_etag(self, sheet_name: str) -> tuple:
+        """Cheap change token for a sheet: the backing file's mtime and size"""
+        try:
+            stat = os.stat(self._file_map[sheet_name])
+            return (stat.st_mtime_ns, stat.st_size)
+        except (KeyError, OSError):
+            return (None, None)
+
+    async def get_sheet_data(self, sheet_name: str, user_id: Optional[str] = None,
+                             with_row_index: bool = False,
+                             as_df: bool = True) -> Union[pd.DataFrame, List[Dict[str, Any]]]:
+        """Get data from local storage (as_df=False returns a list of dicts, as SheetsClient does)"""
+        if sheet_name not in self._file_map:
+            return pd.DataFrame() if as_df else []
+
+        if not as_df:
+            target_user = str(user_id) if user_id else None
+            records = []
+            for position, row in enumerate(self._load_data(self._file_map[sheet_name])):
+                if target_user is None or str(row.get('user_id', '')) == target_user:
+                    if with_row_index:
+                        row['_row_index'] = position + 2
+                    records.append(row)
+            return records
+
+        if user_id:
+            # Filter the records first and only build a DataFrame from this user's rows.
+            # Compare as strings, as SheetsClient does, since user_id might be stored as int
+            target_user = str(user_id)
+            positions, rows = [], []
+            for position, row in enumerate(self._load_data(self._file_map[sheet_name])):
+                if str(row.get('user_id', '')) == target_user:
+                    positions.append(position)
+                    rows.append(row)
+            if not rows:
+                return pd.DataFrame()
+            # Index by position in the file, as a mask over the whole sheet would
+            df = pd.DataFrame(rows, index=positions)
+        else:
+            try:
+                # Parse the JSON Lines file straight into a DataFrame; values are kept as stored
+                df = pd.read_json(self._file_map[sheet_name], lines=True, dtype=False, convert_dates=False)
+            except FileNotFoundError:
+                return pd.DataFrame()
+            except ValueError:
+                # A damaged line - _load_data skips it
+                df = pd.DataFrame(self._load_data(self._file_map[sheet_name]))
+
+            if df.empty:
+                return pd.DataFrame()
+
+        if with_row_index:
+            # 1-based sheet row of each record (row 1 is the header), usable with update_row
+            df['_row_index'] = df.index + 2
 
         return df
 
     async def append_row(self, sheet_name: str, row_data: Dict[str, Any]):
         """Append new row to local storage"""
-        file_map = {
-            "Memories": self.memories_file,
-            "Tasks": self.tasks_file,
-            "Archive": self.archive_file,
-            "Conversations": self.conversations_file
-        }
-
-        if sheet_name not in file_map:
+        if sheet_name not in self._file_map:
             return
 
-        data = self._load_data(file_map[sheet_name])
-
         # Add timestamp if not present
         if 'timestamp' not in row_data:
             row_data['timestamp'] = datetime.now().isoformat()
 
-        data.append(row_data)
-        self._save_data(file_map[sheet_name], data)
+        self._append_data(self._file_map[sheet_name], [row_data])
+
+    async def append_rows(self, sheet_name: str, rows: List[Dict[str, Any]]):
+        """Append several rows to local storage with a single write"""
+        if sheet_name not in self._file_map or not rows:
+            return
+
+        now = datetime.now().isoformat()
+        for row_data in rows:
+            if 'timestamp' not in row_data:
+                row_data['timestamp'] = now
+        self._append_data(self._file_map[sheet_name], rows)
 
     async def update_row(self, sheet_name: str, row_index: int, row_data: Dict[str, Any]):
         """Update existing row in local storage"""
-        file_map = {
-            "Memories": self.memories_file,
-            "Tasks": self.tasks_file,
-            "Archive": self.archive_file,
-            "Conversations": self.conversations_file
-        }
-
-        if sheet_name not in file_map:
+        if sheet_name not in self._file_map:
             return
 
-        data = self._load_data(file_map[sheet_name])
+        data = self._load_data(self._file_map[sheet_name])
 
         if 0 <= row_index - 2 < len(data):  # -2 because sheets are 1-indexed and skip header
             data[row_index - 2].update(row_data)
-            self._save_data(file_map[sheet_name], data)
+            self._save_data(self._file_map[sheet_name], data)
+
+    async def update_rows(self, sheet_name: str, updates: List[Tuple[int, Dict[str, Any]]]):
+        """Update several rows (row_index, row_data) in local storage with a single load/save"""
+        if sheet_name not in self._file_map or not updates:
+            return
+
+        data = self._load_data(self._file_map[sheet_name])
+
+        changed = False
+        for row_index, row_data in updates:
+            if 0 <= row_index - 2 < len(data):  # -2 because sheets are 1-indexed and skip header
+                data[row_index - 2].update(row_data)
+                changed = True
+        if changed:
+            self._save_data(self._file_map[sheet_name], data)
 
     async def find_row_by_id(self, sheet_name: str, user_id: str, item_id: str) -> Optional[int]:
         """Find row index by user_id and item_id"""
-        df = await self.get_sheet_data(sheet_name, user_id)
-        if df.empty:
-            return None
-
-        # Look for matching item
-        for idx, row in df.iterrows():
-            if str(row.get('id', '')) == item_id or str(row.get('task_id', '')) == item_id:
-                return idx + 2  # +2 because sheets are 1-indexed and we skip header
-        return None
\ No newline at end of file
+        row_index, _ = await self.find_row_with_data(sheet_name, user_id, item_id)
+        return row_index
+
+    async def find_row_with_data(self, sheet_name: str, user_id: str,
+                                 item_id: str) -> Tuple[Optional[int], Optional[Dict[str, Any]]]:
+        """Find a row by user_id and item_id, returning (row_index, row_data) from one read"""
+        if sheet_name not in self._file_map:
+            return None, None
+
+        # Walk the records directly - no DataFrame needed to find one row
+        target_user, target_id = str(user_id), str(item_id)
+        id_columns = ('id', 'task_id', 'key', 'memory_id')  # Same ID columns as SheetsClient
+        for idx, row in enumerate(self._load_data(self._file_map[sheet_name])):
+            if str(row.get('user_id', '')) != target_user:
+                continue
+            if any(str(row.get(col, '')) == target_id for col in id_columns):
+                return idx + 2, row  # +2 because sheets are 1-indexed and we skip header
+        return None, None
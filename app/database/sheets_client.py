@@ -1,9 +1,95 @@
 import gspread
+from gspread.utils import ValueInputOption, rowcol_to_a1
 from google.oauth2.service_account import Credentials
+from requests.adapters import HTTPAdapter
+import numpy as np
 import pandas as pd
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Union
+import asyncio
+import concurrent.futures
 import json
+import random
+import threading
+import time
 from datetime import datetime
+from types import MappingProxyType
+
+# Sheets has no cheap change token, so cached views also expire after this long
+# to pick up edits made outside this process (web config UI, manual edits)
+SHEET_ETAG_TTL_SECONDS = 60
+
+# A full sheet pull is reused for this long, so one handler's repeated reads cost one request
+SHEET_DATA_TTL_SECONDS = 2
+
+# Config rows are reused for this long; local set/delete drop them immediately
+CONFIG_TTL_SECONDS = 30
+
+# Per-user profile/settings sheets change about as rarely as Config, so their pulls
+# are kept as long; writes through this client still drop them at once
+SHEET_DATA_TTL_OVERRIDES = {"Users": CONFIG_TTL_SECONDS, "Settings": CONFIG_TTL_SECONDS}
+
+# Expected columns for each sheet type; read-only since every call shares them
+SHEET_COLUMNS = MappingProxyType({
+    "Memories": ("user_id", "category", "key", "value", "embedding", "timestamp", "confidence", "tags"),
+    "Tasks": ("user_id", "task_id", "title", "description", "priority", "status", "deadline",
+              "created_at", "updated_at", "dependencies", "notes",
+              "is_recurring", "recurrence_pattern", "recurrence_end_date", "parent_task_id",
+              "progress_percent", "last_discussed", "completed_at", "archived", "skipped_until"),
+    "Archive": ("user_id", "original_sheet", "content", "archived_at", "reason"),
+    "Conversations": ("user_id", "session_id", "message_type", "content", "timestamp", "intent", "entities"),
+    "Users": ("user_id", "chat_id", "username", "first_seen", "last_active", "preferences"),
+    "Settings": ("user_id", "setting_key", "setting_value", "updated_at"),
+    "Config": ("user_id", "variable", "value", "description", "type")
+})
+
+# Columns that may hold a row's ID, checked by find_row_by_id
+ID_COLUMNS = ('id', 'task_id', 'key', 'memory_id')
+
+# sheet name -> {column name: 1-based column number}
+SHEET_COLUMN_NUMBERS = MappingProxyType({
+    sheet_name: MappingProxyType({col_name: i + 1 for i, col_name in enumerate(columns)})
+    for sheet_name, columns in SHEET_COLUMNS.items()
+})
+
+# Transient API failures are retried with exponential backoff plus jitter:
+# RETRY_BASE_SECONDS * 2**attempt + up to 1s, capped at RETRY_MAX_DELAY_SECONDS
+RETRY_MAX_TRIES = 6
+RETRY_BASE_SECONDS = 0.5
+RETRY_MAX_DELAY_SECONDS = 30
+RETRYABLE_STATUS_CODES = (429, 500, 502, 503, 504)
+# Appends and row deletes aren't safe to repeat if a 5xx hid a request that went through,
+# so they are only retried on a rate limit (which is rejected before anything is written)
+RATE_LIMIT_STATUS_CODES = (429,)
+
+# Most Sheets requests in flight at once across all threads; the HTTP connection pool is
+# sized to match so every concurrent request reuses a kept-alive connection
+SHEETS_MAX_CONCURRENT_REQUESTS = 8
+_request_slots = threading.BoundedSemaphore(SHEETS_MAX_CONCURRENT_REQUESTS)
+
+
+def _with_retry(fn, *args, retry_on: Tuple[int, ...] = RETRYABLE_STATUS_CODES, **kwargs):
+    """Call a gspread function, retrying APIErrors whose status is in retry_on.
+
+    Each attempt waits for one of the SHEETS_MAX_CONCURRENT_REQUESTS slots (backoff
+    sleeps don't hold one). Blocks while it waits, so async callers run it through
+    asyncio.to_thread.
+    """
+    for attempt in range(RETRY_MAX_TRIES):
+        try:
+            with _request_slots:
+                return fn(*args, **kwargs)
+        except gspread.exceptions.APIError as e:
+            status = getattr(getattr(e, 'response', None), 'status_code', None)
+            if status not in retry_on or attempt == RETRY_MAX_TRIES - 1:
+                raise
+            delay = min(RETRY_MAX_DELAY_SECONDS, RETRY_BASE_SECONDS * 2 ** attempt) + random.random()
+            print(f"Sheets API returned {status}, retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+# Sheet cache entry: (monotonic fetch time, unfiltered DataFrame, {user_id: row positions},
+# {(user_id, item id): row position} filled on first lookup, (header row, data rows) as pulled)
+_FrameEntry = Tuple[float, pd.DataFrame, Dict[str, Any], Dict[Tuple[str, str], int],
+                    Tuple[List[str], List[List[str]]]]
 
 class SheetsClient:
     def __init__(self, credentials_path: str, spreadsheet_id: str):
@@ -22,57 +108,146 @@ class SheetsClient:
         ]
         self.creds = Credentials.from_service_account_file(credentials_path, scopes=scopes)
         self.client = gspread.authorize(self.creds)
+        try:
+            # One kept-alive connection per request slot, so concurrent calls don't reconnect
+            adapter = HTTPAdapter(pool_connections=SHEETS_MAX_CONCURRENT_REQUESTS,
+                                  pool_maxsize=SHEETS_MAX_CONCURRENT_REQUESTS)
+            self.client.http_client.session.mount("https://", adapter)
+        except AttributeError as e:
+            print(f"Warning: Could not configure Sheets connection pool: {e}")
         self.spreadsheet = self.client.open_by_key(spreadsheet_id)
 
+        # sheet name -> Worksheet, so each call doesn't look the sheet up again
+        self._ws_cache: Dict[str, gspread.Worksheet] = {}
+
+        # Per-sheet count of writes made through this client (see get_sheet_etag)
+        self._write_generation: Dict[str, int] = {}
+
+        # sheet name -> _FrameEntry, dropped on any write to the sheet
+        self._sheet_frames: Dict[str, _FrameEntry] = {}
+
+        # (sheet name, write generation) -> pull in progress, which concurrent readers wait on
+        # instead of starting their own. A thread-safe Future rather than an asyncio one, as
+        # callers may be on different event loops
+        self._inflight_pulls: Dict[Tuple[str, int], concurrent.futures.Future] = {}
+
+        # (monotonic fetch time, Config records, {(variable, user_id): value},
+        # {(variable, user_id): sheet row}), see _load_config
+        self._config_cache: Optional[Tuple[float, List[Dict], Dict[Tuple[str, str], str],
+                                           Dict[Tuple[str, str], int]]] = None
+        # Held while Config is refetched, so concurrent loads wait for that one read
+        self._config_lock = threading.Lock()
+
         # Ensure required sheets exist
         self._ensure_sheets_exist()
 
     def _ensure_sheets_exist(self):
-        """Create required sheets if they don't exist and ensure they have proper headers"""
+        """Create required sheets if they don't exist and ensure they have proper headers.
+
+        Missing sheets are created in one batchUpdate, existing header rows are
+        read in one values batchGet and all header writes go out in one values
+        batchUpdate, so startup costs a handful of requests rather than a few per sheet.
+        """
         required_sheets = ["Memories", "Tasks", "Archive", "Conversations", "Users", "Settings", "Config"]
-        existing_sheets = [sheet.title for sheet in self.spreadsheet.worksheets()]
-
-        for sheet_name in required_sheets:
-            if sheet_name not in existing_sheets:
-                # Create the sheet
-                sheet = self.spreadsheet.add_worksheet(title=sheet_name, rows=1000, cols=20)
-                print(f"Created sheet: {sheet_name}")
-
-                # Add headers to the new sheet
-                headers = self._get_sheet_columns(sheet_name)
-                if headers:
-                    sheet.update('A1', [headers])
-                    print(f"Added headers to {sheet_name}: {headers}")
-            else:
-                # Check if existing sheet has headers, if not, add them
-                sheet = self.spreadsheet.worksheet(sheet_name)
-                try:
-                    current_headers = sheet.row_values(1)
-                    expected_headers = self._get_sheet_columns(sheet_name)
-
-                    if not current_headers or len(current_headers) < len(expected_headers):
-                        sheet.update('A1', [expected_headers])
-                        print(f"Updated headers for {sheet_name}: {expected_headers}")
-                except Exception as e:
-                    print(f"Warning: Could not check headers for {sheet_name}: {e}")
-                    # Try to add headers anyway
-                    try:
-                        expected_headers = self._get_sheet_columns(sheet_name)
-                        if expected_headers:
-                            sheet.update('A1', [expected_headers])
-                            print(f"Added headers to {sheet_name}: {expected_headers}")
-                    except Exception as e2:
-                        print(f"Error adding headers to {sheet_name}: {e2}")
+        self._ws_cache = {sheet.title: sheet for sheet in _with_retry(self.spreadsheet.worksheets)}
+
+        missing = [name for name in required_sheets if name not in self._ws_cache]
+        existing = [name for name in required_sheets if name in self._ws_cache]
+
+        if missing:
+            # Create the sheets
+            _with_retry(self.spreadsheet.batch_update, {"requests": [
+                {"addSheet": {"properties": {"title": name,
+                                             "gridProperties": {"rowCount": 1000, "columnCount": 20}}}}
+                for name in missing
+            ]}, retry_on=RATE_LIMIT_STATUS_CODES)
+            self._ws_cache = {sheet.title: sheet for sheet in _with_retry(self.spreadsheet.worksheets)}
+            print(f"Created sheets: {missing}")
+
+        # Current header row of each sheet; new sheets have none
+        headers = {name: [] for name in missing}
+        if existing:
+            try:
+                response = _with_retry(self.spreadsheet.values_batch_get, [f"'{name}'!1:1" for name in existing])
+                for name, value_range in zip(existing, response.get('valueRanges', [])):
+                    headers[name] = value_range.get('values', [[]])[0]
+            except Exception as e:
+                # Try to add headers anyway
+                print(f"Warning: Could not check headers for {existing}: {e}")
+                headers.update({name: [] for name in existing})
+
+        # Add headers to new sheets and to existing sheets missing them
+        header_updates = {}
+        for name in required_sheets:
+            expected_headers = self._get_sheet_columns(name)
+            current_headers = headers.get(name, [])
+            if expected_headers and (not current_headers or len(current_headers) < len(expected_headers)):
+                header_updates[name] = list(expected_headers)
+
+        if header_updates:
+            try:
+                _with_retry(self.spreadsheet.values_batch_update, {
+                    "valueInputOption": "RAW",
+                    "data": [{"range": f"'{name}'!A1", "values": [columns]}
+                             for name, columns in header_updates.items()]
+                })
+                headers.update(header_updates)
+                for name, columns in header_updates.items():
+                    print(f"Updated headers for {name}: {columns}")
+            except Exception as e:
+                print(f"Error adding headers to {list(header_updates)}: {e}")
 
         # Run migrations for schema changes
-        self._migrate_config_sheet()
-        self._migrate_tasks_sheet()
+        self._migrate_config_sheet(headers.get("Config"))
+        self._migrate_tasks_sheet(headers.get("Tasks"))
+
+    @staticmethod
+    def _get_values(sheet: gspread.Worksheet) -> Tuple[List[str], List[List[str]]]:
+        """(header row, data rows) from a single get_all_values call, cells as strings"""
+        values = _with_retry(sheet.get_all_values)
+        if not values:
+            return [], []
+        return values[0], values[1:]
+
+    @staticmethod
+    def _get_records(sheet: gspread.Worksheet) -> List[Dict[str, Any]]:
+        """Rows as dicts keyed by the header row, from a single get_all_values call.
+
+        Unlike get_all_records, cell values are left as the strings shown in the
+        sheet rather than converted to numbers.
+        """
+        headers, rows = SheetsClient._get_values(sheet)
+        return [dict(zip(headers, row)) for row in rows]
+
+    @staticmethod
+    def _values_frame(headers: List[str], rows: List[List[str]]) -> pd.DataFrame:
+        """DataFrame of the rows, built from the lists without a dict per row.
 
-    def _migrate_tasks_sheet(self):
-        """Migrate Tasks sheet to add skipped_until column if missing."""
+        Falls back to per-row dicts (as _get_records) for a header row with repeated
+        names or rows of another width, where the two would build different frames.
+        """
+        width = len(headers)
+        if len(set(headers)) == width and all(len(row) == width for row in rows):
+            return pd.DataFrame(rows, columns=headers) if rows else pd.DataFrame()
+        return pd.DataFrame([dict(zip(headers, row)) for row in rows])
+
+    def _ws(self, sheet_name: str) -> gspread.Worksheet:
+        """Worksheet handle for sheet_name, looked up once and then reused"""
+        sheet = self._ws_cache.get(sheet_name)
+        if sheet is None:
+            sheet = _with_retry(self.spreadsheet.worksheet, sheet_name)
+            self._ws_cache[sheet_name] = sheet
+        return sheet
+
+    def _migrate_tasks_sheet(self, headers: Optional[List[str]] = None):
+        """Migrate Tasks sheet to add skipped_until column if missing.
+
+        headers is the sheet's header row if the caller already has it.
+        """
         try:
-            sheet = self.spreadsheet.worksheet("Tasks")
-            headers = sheet.row_values(1)
+            sheet = self._ws("Tasks")
+            if headers is None:
+                headers = sheet.row_values(1)
 
             # Check if skipped_until column exists
             if headers and 'skipped_until' not in headers:
@@ -85,11 +260,15 @@ class SheetsClient:
         except Exception as e:
             print(f"Error migrating Tasks sheet: {e}")
 
-    def _migrate_config_sheet(self):
-        """Migrate Config sheet to add user_id column if missing (for per-user settings)."""
+    def _migrate_config_sheet(self, headers: Optional[List[str]] = None):
+        """Migrate Config sheet to add user_id column if missing (for per-user settings).
+
+        headers is the sheet's header row if the caller already has it.
+        """
         try:
-            sheet = self.spreadsheet.worksheet("Config")
-            headers = sheet.row_values(1)
+            sheet = self._ws("Config")
+            if headers is None:
+                headers = sheet.row_values(1)
 
             # Check if migration is needed: old format has 'variable' in column A
             if headers and headers[0] == 'variable':
@@ -115,116 +294,349 @@ class SheetsClient:
         except Exception as e:
             print(f"Error migrating Config sheet: {e}")
 
-    async def get_sheet_data(self, sheet_name: str, user_id: Optional[str] = None) -> pd.DataFrame:
-        """Get data from sheet with optional user filtering"""
+    async def get_sheet_data(self, sheet_name: str, user_id: Optional[str] = None,
+                             with_row_index: bool = False,
+                             as_df: bool = True) -> Union[pd.DataFrame, List[Dict[str, Any]]]:
+        """Get data from sheet with optional user filtering.
+
+        with_row_index adds a `_row_index` column holding each record's sheet row,
+        so callers can update a row they just read without a find_row_by_id pass.
+        as_df=False returns the records as a list of dicts instead, for callers
+        that only look through a few rows.
+        """
         try:
-            sheet = self.spreadsheet.worksheet(sheet_name)
-            data = sheet.get_all_records()
+            _, df, user_rows, _, (headers, rows) = await self._get_frame(sheet_name)
 
-            if not data:
+            if not as_df:
+                if user_id and 'user_id' in df.columns:
+                    positions = user_rows.get(str(user_id), [])
+                else:
+                    positions = range(len(rows))
+                # Only the rows asked for become dicts; each is new, so callers can modify it
+                records = [dict(zip(headers, rows[i])) for i in positions]
+                if with_row_index:
+                    for i, record in zip(positions, records):
+                        record['_row_index'] = int(i) + 2
+                return records
+
+            if df.empty:
                 # Return empty DataFrame with expected columns
                 return pd.DataFrame()
 
-            df = pd.DataFrame(data)
-
+            # Callers may modify what they get - never hand out the cached frame
             if user_id and 'user_id' in df.columns:
-                # Convert both to string for comparison since user_id might be stored as int
-                df = df[df['user_id'].astype(str) == str(user_id)]
+                df = df.iloc[user_rows.get(str(user_id), [])].copy()
+            else:
+                df = df.copy()
+
+            if with_row_index:
+                # 1-based sheet row of each record (row 1 is the header), usable with update_row
+                df['_row_index'] = df.index + 2
 
             return df
         except Exception as e:
             print(f"Error getting sheet data: {e}")
-            return pd.DataFrame()
-
-    async def append_row(self, sheet_name: str, row_data: Dict[str, Any]):
-        """Append new row to sheet"""
+            return pd.DataFrame() if as_df else []
+
+    def _fresh_frame(self, sheet_name: str) -> Optional[_FrameEntry]:
+        """The sheet's cache entry if it is still within its TTL, else None"""
+        cached = self._sheet_frames.get(sheet_name)
+        ttl = SHEET_DATA_TTL_OVERRIDES.get(sheet_name, SHEET_DATA_TTL_SECONDS)
+        if cached is not None and time.monotonic() - cached[0] < ttl:
+            return cached
+        return None
+
+    async def _get_frame(self, sheet_name: str) -> _FrameEntry:
+        """Cache entry for the whole sheet, pulled again after its TTL (SHEET_DATA_TTL_SECONDS
+        unless overridden in SHEET_DATA_TTL_OVERRIDES) or a write"""
+        cached = self._fresh_frame(sheet_name)
+        if cached is not None:
+            return cached
+
+        generation = self._write_generation.get(sheet_name, 0)
+        key = (sheet_name, generation)
+        # Share a pull already under way, unless a write has happened since it started
+        pending = self._inflight_pulls.get(key)
+        if pending is not None:
+            return await asyncio.wrap_future(pending)
+
+        pending = concurrent.futures.Future()
+        self._inflight_pulls[key] = pending
+        try:
+            fetched_at = time.monotonic()
+            sheet = self._ws(sheet_name)
+            headers, rows = await asyncio.to_thread(self._get_values, sheet)
+            df = self._values_frame(headers, rows)
+            # Row positions of each user's records, so per-user reads don't rescan the column.
+            # Every cell is a string, so no conversion is needed to compare ids
+            if 'user_id' in df.columns:
+                user_rows = df.groupby('user_id', sort=False).indices
+            else:
+                user_rows = {}
+            entry = (fetched_at, df, user_rows, {}, (headers, rows))
+            # Don't keep a pull that a concurrent write may have overtaken
+            if self._write_generation.get(sheet_name, 0) == generation:
+                self._sheet_frames[sheet_name] = entry
+            pending.set_result(entry)
+            return entry
+        except Exception as e:
+            pending.set_exception(e)
+            raise
+        finally:
+            # Waiters see cancellation if this pull was cancelled
+            pending.cancel()
+            self._inflight_pulls.pop(key, None)
+
+    def get_sheet_etag(self, sheet_name: str) -> tuple:
+        """Cheap change token for a sheet: bumps on local writes and every SHEET_ETAG_TTL_SECONDS"""
+        return (self._write_generation.get(sheet_name, 0), int(time.monotonic() // SHEET_ETAG_TTL_SECONDS))
+
+    def _mark_written(self, sheet_name: str):
+        # Called before and after each write, so neither the etag nor a pull made mid-write stays current
+        self._write_generation[sheet_name] = self._write_generation.get(sheet_name, 0) + 1
+        self._sheet_frames.pop(sheet_name, None)
+
+    async def append_row(self, sheet_name: str, row_data: Dict[str, Any]) -> bool:
+        """Append new row to sheet; False if the write failed"""
+        self._mark_written(sheet_name)
         try:
-            sheet = self.spreadsheet.worksheet(sheet_name)
+            sheet = self._ws(sheet_name)
             # Convert all values to strings for Google Sheets
             row_values = [str(row_data.get(col, '')) for col in self._get_sheet_columns(sheet_name)]
-            sheet.append_row(row_values)
+            await asyncio.to_thread(_with_retry, sheet.append_row, row_values, retry_on=RATE_LIMIT_STATUS_CODES)
+            return True
         except Exception as e:
             print(f"Error appending row: {e}")
+            return False
+        finally:
+            self._mark_written(sheet_name)
 
-    async def update_row(self, sheet_name: str, row_index: int, row_data: Dict[str, Any]):
-        """Update existing row - only updates specified columns"""
+    async def append_rows(self, sheet_name: str, rows: List[Dict[str, Any]]) -> bool:
+        """Append several rows to sheet in a single API call; False if the write failed"""
+        if not rows:
+            return True
+        self._mark_written(sheet_name)
         try:
-            sheet = self.spreadsheet.worksheet(sheet_name)
+            sheet = self._ws(sheet_name)
             columns = self._get_sheet_columns(sheet_name)
-            
+            await asyncio.to_thread(
+                _with_retry, sheet.append_rows,
+                [[str(row_data.get(col, '')) for col in columns] for row_data in rows],
+                retry_on=RATE_LIMIT_STATUS_CODES
+            )
+            return True
+        except Exception as e:
+            print(f"Error appending rows: {e}")
+            return False
+        finally:
+            self._mark_written(sheet_name)
+
+    async def update_row(self, sheet_name: str, row_index: int, row_data: Dict[str, Any]) -> bool:
+        """Update existing row - only updates specified columns, in a single API call.
+
+        False if the write failed.
+        """
+        self._mark_written(sheet_name)
+        try:
+            sheet = self._ws(sheet_name)
+
             # Update only the columns specified in row_data
-            for col_name, value in row_data.items():
-                if col_name in columns:
-                    col_index = columns.index(col_name) + 1  # 1-indexed
-                    sheet.update_cell(row_index, col_index, str(value))
-                    
+            ranges = self._cell_ranges(sheet_name, [(row_index, row_data)])
+            if ranges:
+                # USER_ENTERED, as update_cell does
+                await asyncio.to_thread(
+                    _with_retry, sheet.batch_update, ranges, value_input_option=ValueInputOption.user_entered
+                )
+
             print(f"Updated row {row_index} in {sheet_name}: {list(row_data.keys())}")
+            return True
         except Exception as e:
             print(f"Error updating row: {e}")
+            return False
+        finally:
+            self._mark_written(sheet_name)
+
+    async def update_rows(self, sheet_name: str, updates: List[Tuple[int, Dict[str, Any]]]) -> bool:
+        """Update columns of several rows (row_index, row_data) in a single API call.
+
+        False if the write failed.
+        """
+        if not updates:
+            return True
+        self._mark_written(sheet_name)
+        try:
+            sheet = self._ws(sheet_name)
+            ranges = self._cell_ranges(sheet_name, updates)
+            if ranges:
+                # USER_ENTERED, as update_cell does
+                await asyncio.to_thread(
+                    _with_retry, sheet.batch_update, ranges, value_input_option=ValueInputOption.user_entered
+                )
+            print(f"Updated {len(updates)} rows in {sheet_name}")
+            return True
+        except Exception as e:
+            print(f"Error updating rows: {e}")
+            return False
+        finally:
+            self._mark_written(sheet_name)
+
+    @staticmethod
+    def _cell_ranges(sheet_name: str, updates: List[Tuple[int, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """batch_update ranges for (row_index, row_data) updates, one range per run of adjacent columns"""
+        columns = SHEET_COLUMN_NUMBERS.get(sheet_name, {})
+        ranges = []
+        for row_index, row_data in updates:
+            cells = sorted((columns[col_name], str(value)) for col_name, value in row_data.items()
+                           if col_name in columns)
+            start = 0
+            for i in range(1, len(cells) + 1):
+                if i == len(cells) or cells[i][0] != cells[i - 1][0] + 1:
+                    first, last = cells[start][0], cells[i - 1][0]
+                    a1 = rowcol_to_a1(row_index, first)
+                    if last != first:
+                        a1 += ":" + rowcol_to_a1(row_index, last)
+                    ranges.append({"range": a1, "values": [[value for _, value in cells[start:i]]]})
+                    start = i
+        return ranges
 
     async def find_row_by_id(self, sheet_name: str, user_id: str, item_id: str) -> Optional[int]:
-        """Find row index by user_id and item_id/key"""
+        """Find row index by user_id and item_id/key.
+
+        Without a recent pull of the sheet to search, only the user_id and ID
+        columns are fetched rather than every row in full.
+        """
+        if self._fresh_frame(sheet_name) is None:
+            try:
+                checked, row_index = await asyncio.to_thread(
+                    self._find_row_in_id_columns, sheet_name, str(user_id), str(item_id)
+                )
+                if checked:
+                    return row_index
+            except Exception as e:
+                print(f"Error finding row from ID columns, reading whole sheet: {e}")
+
+        row_index, _ = await self.find_row_with_data(sheet_name, user_id, item_id)
+        return row_index
+
+    def _find_row_in_id_columns(self, sheet_name: str, user_id: str, item_id: str) -> Tuple[bool, Optional[int]]:
+        """Search just the user_id and ID columns, fetched in one values batchGet.
+
+        Returns (checked, row_index); checked is False when the sheet's header row
+        doesn't match SHEET_COLUMNS, in which case the caller must search the whole sheet.
+        """
+        if not item_id:
+            # A blank ID names no row (it would only match unused ID columns)
+            return True, None
+
+        columns = SHEET_COLUMN_NUMBERS.get(sheet_name, {})
+        wanted = [col for col in ('user_id',) + ID_COLUMNS if col in columns]
+        if len(wanted) < 2 or wanted[0] != 'user_id':
+            return False, None
+
+        letters = [rowcol_to_a1(1, columns[col])[:-1] for col in wanted]
+        response = _with_retry(self.spreadsheet.values_batch_get,
+                               [f"'{sheet_name}'!{letter}:{letter}" for letter in letters])
+        column_cells = [value_range.get('values', []) for value_range in response.get('valueRanges', [])]
+
+        # Column positions come from SHEET_COLUMNS - only trust them if the headers agree
+        if len(column_cells) != len(wanted) or any(
+            not cells or cells[0][:1] != [col] for col, cells in zip(wanted, column_cells)
+        ):
+            return False, None
+
+        # Trailing empty cells are left out of each column, so pad them to the same length
+        length = max(len(cells) for cells in column_cells) - 1
+        arrays = []
+        for cells in column_cells:
+            values = [row[0] if row else '' for row in cells[1:]]
+            arrays.append(np.array(values + [''] * (length - len(values)), dtype=object))
+
+        matches = (arrays[0] == user_id) & np.logical_or.reduce([column == item_id for column in arrays[1:]])
+        hits = np.flatnonzero(matches)
+        # +2 because sheets are 1-indexed and we skip header
+        return True, (int(hits[0]) + 2 if len(hits) else None)
+
+    async def find_row_with_data(self, sheet_name: str, user_id: str,
+                                 item_id: str) -> Tuple[Optional[int], Optional[Dict[str, Any]]]:
+        """Find a row by user_id and item_id/key, returning (row_index, row_data) from one read"""
         try:
-            # Get full sheet data (not filtered) to get correct row index
-            sheet = self.spreadsheet.worksheet(sheet_name)
-            all_data = sheet.get_all_records()
-            
-            if not all_data:
-                return None
-
-            # Look for matching item - check all possible ID columns
-            id_columns = ['id', 'task_id', 'key', 'memory_id']
-            
-            for idx, row in enumerate(all_data):
-                # Check if this row belongs to the user
-                if str(row.get('user_id', '')) != str(user_id):
-                    continue
-                    
-                # Check all possible ID columns
-                for col in id_columns:
-                    if str(row.get(col, '')) == str(item_id):
-                        return idx + 2  # +2 because sheets are 1-indexed and we skip header
-            
-            return None
+            _, df, _, id_rows, _ = await self._get_frame(sheet_name)
+            if df.empty or 'user_id' not in df.columns:
+                return None, None
+
+            if not id_rows:
+                # Index every row under each of its non-empty ID columns; the first
+                # row wins, as in a top-to-bottom scan
+                user_ids = df['user_id'].tolist()
+                for col in ID_COLUMNS:
+                    if col not in df.columns:
+                        continue
+                    for position, key in enumerate(zip(user_ids, df[col].tolist())):
+                        if key[1] and id_rows.get(key, position) >= position:
+                            id_rows[key] = position
+
+            position = id_rows.get((str(user_id), str(item_id)))
+            if position is None:
+                return None, None
+            # +2 because sheets are 1-indexed and we skip header
+            return position + 2, df.iloc[[position]].to_dict('records')[0]
         except Exception as e:
             print(f"Error finding row: {e}")
-            return None
+            return None, None
     
     async def delete_row(self, sheet_name: str, row_index: int):
         """Delete a row from the sheet"""
+        self._mark_written(sheet_name)
         try:
-            sheet = self.spreadsheet.worksheet(sheet_name)
-            sheet.delete_rows(row_index)
+            sheet = self._ws(sheet_name)
+            await asyncio.to_thread(_with_retry, sheet.delete_rows, row_index, retry_on=RATE_LIMIT_STATUS_CODES)
             print(f"Deleted row {row_index} from {sheet_name}")
         except Exception as e:
             print(f"Error deleting row: {e}")
+        finally:
+            self._mark_written(sheet_name)
+
+    async def delete_rows(self, sheet_name: str, row_indices: List[int]):
+        """Delete several rows from the sheet in a single batchUpdate.
+
+        Adjacent rows are deleted as one range, and ranges go bottom-up so each
+        deletion leaves the row numbers of the ones still to come unchanged.
+        """
+        runs = []  # [start, end] sheet rows, inclusive, from the bottom of the sheet up
+        for row_index in sorted(set(row_indices), reverse=True):
+            if runs and runs[-1][0] == row_index + 1:
+                runs[-1][0] = row_index
+            else:
+                runs.append([row_index, row_index])
+        if not runs:
+            return
 
-    def _get_sheet_columns(self, sheet_name: str) -> List[str]:
+        self._mark_written(sheet_name)
+        try:
+            sheet = self._ws(sheet_name)
+            body = {"requests": [
+                {"deleteDimension": {"range": {"sheetId": sheet.id, "dimension": "ROWS",
+                                               "startIndex": start - 1, "endIndex": end}}}
+                for start, end in runs
+            ]}
+            await asyncio.to_thread(_with_retry, self.spreadsheet.batch_update, body,
+                                    retry_on=RATE_LIMIT_STATUS_CODES)
+            print(f"Deleted {sum(end - start + 1 for start, end in runs)} rows from {sheet_name}")
+        except Exception as e:
+            print(f"Error deleting rows: {e}")
+        finally:
+            self._mark_written(sheet_name)
+
+    def _get_sheet_columns(self, sheet_name: str) -> Tuple[str, ...]:
         """Get expected columns for each sheet type"""
-        columns = {
-            "Memories": ["user_id", "category", "key", "value", "embedding", "timestamp", "confidence", "tags"],
-            "Tasks": ["user_id", "task_id", "title", "description", "priority", "status", "deadline",
-                      "created_at", "updated_at", "dependencies", "notes",
-                      "is_recurring", "recurrence_pattern", "recurrence_end_date", "parent_task_id",
-                      "progress_percent", "last_discussed", "completed_at", "archived", "skipped_until"],
-            "Archive": ["user_id", "original_sheet", "content", "archived_at", "reason"],
-            "Conversations": ["user_id", "session_id", "message_type", "content", "timestamp", "intent", "entities"],
-            "Users": ["user_id", "chat_id", "username", "first_seen", "last_active", "preferences"],
-            "Settings": ["user_id", "setting_key", "setting_value", "updated_at"],
-            "Config": ["user_id", "variable", "value", "description", "type"]
-        }
-        return columns.get(sheet_name, [])
+        return SHEET_COLUMNS.get(sheet_name, ())
 
     async def get_user_setting(self, user_id: str, setting_key: str) -> Optional[str]:
         """Get a specific user setting"""
         try:
-            df = await self.get_sheet_data("Settings", user_id)
-            if df.empty:
-                return None
-            match = df[df['setting_key'] == setting_key]
-            if not match.empty:
-                return str(match.iloc[0]['setting_value'])
-            return None
+            rows = await self.get_sheet_data("Settings", user_id, as_df=False)
+            return next((str(row.get('setting_value', '')) for row in rows
+                         if row.get('setting_key') == setting_key), None)
         except Exception as e:
             print(f"Error getting user setting: {e}")
             return None
@@ -232,19 +644,17 @@ class SheetsClient:
     async def set_user_setting(self, user_id: str, setting_key: str, setting_value: str):
         """Set a user setting (creates or updates)"""
         try:
-            df = await self.get_sheet_data("Settings", user_id)
+            rows = await self.get_sheet_data("Settings", user_id, with_row_index=True, as_df=False)
             now = datetime.now().isoformat()
 
-            if not df.empty:
-                match = df[df['setting_key'] == setting_key]
-                if not match.empty:
-                    # Update existing
-                    row_idx = match.index[0] + 2  # +2 for header and 0-indexing
-                    await self.update_row("Settings", row_idx, {
-                        "setting_value": setting_value,
-                        "updated_at": now
-                    })
-                    return
+            row_idx = next((row['_row_index'] for row in rows if row.get('setting_key') == setting_key), None)
+            if row_idx is not None:
+                # Update existing
+                await self.update_row("Settings", row_idx, {
+                    "setting_value": setting_value,
+                    "updated_at": now
+                })
+                return
 
             # Create new
             await self.append_row("Settings", {
@@ -259,15 +669,12 @@ class SheetsClient:
     async def get_all_user_settings(self, user_id: str) -> Dict[str, str]:
         """Get all settings for a user as a dict"""
         try:
-            df = await self.get_sheet_data("Settings", user_id)
-            if df.empty:
-                return {}
+            rows = await self.get_sheet_data("Settings", user_id, as_df=False)
             settings = {}
-            for _, row in df.iterrows():
+            for row in rows:
                 key = str(row.get('setting_key', ''))
-                value = str(row.get('setting_value', ''))
                 if key:
-                    settings[key] = value
+                    settings[key] = str(row.get('setting_value', ''))
             return settings
         except Exception as e:
             print(f"Error getting all user settings: {e}")
@@ -281,30 +688,68 @@ class SheetsClient:
         2. Fall back to global value (empty user_id)
         """
         try:
-            sheet = self.spreadsheet.worksheet("Config")
-            data = sheet.get_all_records()
-
-            global_value = None
-            user_value = None
-
-            for row in data:
-                if str(row.get('variable', '')) == variable:
-                    row_user_id = str(row.get('user_id', '')).strip()
-                    if not row_user_id:
-                        # Global default
-                        global_value = str(row.get('value', ''))
-                    elif user_id and row_user_id == str(user_id):
-                        # User-specific override
-                        user_value = str(row.get('value', ''))
+            _, values = self._get_config_records()
 
-            # Return user-specific if found, otherwise global
-            return user_value if user_value is not None else global_value
+            # User-specific override if found, otherwise global default (empty user_id)
+            if user_id:
+                user_value = values.get((variable, str(user_id)))
+                if user_value is not None:
+                    return user_value
+            return values.get((variable, ''))
         except Exception as e:
             print(f"Error getting config: {e}")
             return None
 
+    def _load_config(self) -> Tuple[float, List[Dict], Dict[Tuple[str, str], str], Dict[Tuple[str, str], int]]:
+        """Config cache entry, refetched after CONFIG_TTL_SECONDS: (fetch time, records,
+        (variable, user_id) -> value, (variable, user_id) -> sheet row)"""
+        cached = self._config_cache
+        if cached is not None and time.monotonic() - cached[0] < CONFIG_TTL_SECONDS:
+            return cached
+
+        with self._config_lock:
+            # Another thread may have reloaded it while this one waited
+            cached = self._config_cache
+            if cached is not None and time.monotonic() - cached[0] < CONFIG_TTL_SECONDS:
+                return cached
+
+            fetched_at = time.monotonic()
+            data = self._get_records(self._ws("Config"))
+            values = {}
+            rows = {}
+            for idx, row in enumerate(data):
+                key = (str(row.get('variable', '')), str(row.get('user_id', '')).strip())
+                # Later rows win for reads, as in a top-to-bottom scan; set_config updates the first
+                values[key] = str(row.get('value', ''))
+                rows.setdefault(key, idx + 2)
+            self._config_cache = (fetched_at, data, values, rows)
+            return self._config_cache
+
+    async def _load_config_async(self) -> Tuple[float, List[Dict], Dict[Tuple[str, str], str], Dict[Tuple[str, str], int]]:
+        """_load_config with any sheet read done off the event loop"""
+        cached = self._config_cache
+        if cached is not None and time.monotonic() - cached[0] < CONFIG_TTL_SECONDS:
+            return cached
+        return await asyncio.to_thread(self._load_config)
+
+    def _get_config_records(self) -> Tuple[List[Dict], Dict[Tuple[str, str], str]]:
+        """Config sheet records plus a (variable, user_id) -> value index, cached for CONFIG_TTL_SECONDS"""
+        _, data, values, _ = self._load_config()
+        return data, values
+
+    async def _get_config_records_async(self) -> Tuple[List[Dict], Dict[Tuple[str, str], str]]:
+        """_get_config_records with any sheet read done off the event loop"""
+        _, data, values, _ = await self._load_config_async()
+        return data, values
+
     async def get_config(self, variable: str, user_id: Optional[str] = None) -> Optional[str]:
         """Get a config variable with optional per-user override"""
+        try:
+            # Load the records off the event loop; the lookup below then hits the cache
+            await self._get_config_records_async()
+        except Exception as e:
+            print(f"Error getting config: {e}")
+            return None
         return self.get_config_sync(variable, user_id)
 
     async def get_all_config(self, user_id: Optional[str] = None) -> Dict[str, str]:
@@ -314,28 +759,16 @@ class SheetsClient:
         (user override if exists, otherwise global default).
         """
         try:
-            sheet = self.spreadsheet.worksheet("Config")
-            data = sheet.get_all_records()
+            _, values = await self._get_config_records_async()
 
             # First collect all global defaults
-            config = {}
-            for row in data:
-                var = str(row.get('variable', ''))
-                val = str(row.get('value', ''))
-                row_user_id = str(row.get('user_id', '')).strip()
-
-                if var and not row_user_id:
-                    # Global default
-                    config[var] = val
+            config = {var: val for (var, row_user_id), val in values.items() if var and not row_user_id}
 
             # Then apply user-specific overrides if user_id provided
             if user_id:
-                for row in data:
-                    var = str(row.get('variable', ''))
-                    val = str(row.get('value', ''))
-                    row_user_id = str(row.get('user_id', '')).strip()
-
-                    if var and row_user_id == str(user_id):
+                target_user_id = str(user_id)
+                for (var, row_user_id), val in values.items():
+                    if var and row_user_id == target_user_id:
                         # User-specific override
                         config[var] = val
 
@@ -352,12 +785,12 @@ class SheetsClient:
         - User-specific entries for variables with user override
         """
         try:
-            sheet = self.spreadsheet.worksheet("Config")
-            data = sheet.get_all_records()
+            data, _ = await self._get_config_records_async()
 
             # Collect globals and user overrides separately
             globals_dict = {}
             user_overrides = {}
+            target_user_id = str(user_id) if user_id else None
 
             for row in data:
                 var = str(row.get('variable', ''))
@@ -375,7 +808,7 @@ class SheetsClient:
 
                 if not row_user_id:
                     globals_dict[var] = entry
-                elif user_id and row_user_id == str(user_id):
+                elif row_user_id == target_user_id:
                     user_overrides[var] = entry
 
             # Build result: use user override if exists, otherwise global
@@ -393,54 +826,75 @@ class SheetsClient:
 
     async def set_config(self, variable: str, value: str, user_id: Optional[str] = None,
                         description: str = "", var_type: str = "string") -> bool:
-        """Set a config variable. If user_id provided, sets user-specific override."""
-        try:
-            sheet = self.spreadsheet.worksheet("Config")
-            data = sheet.get_all_records()
+        """Set a config variable. If user_id provided, sets user-specific override.
 
+        The row is located through the cached Config index instead of a full
+        sheet read; a hit is checked against the live row first, since the
+        sheet may have been edited elsewhere (e.g. the web config UI).
+        """
+        try:
+            sheet = self._ws("Config")
             target_user_id = str(user_id) if user_id else ""
-
-            # Find existing row
-            for idx, row in enumerate(data):
-                row_var = str(row.get('variable', ''))
-                row_user_id = str(row.get('user_id', '')).strip()
-
-                if row_var == variable and row_user_id == target_user_id:
-                    # Update existing row (value is in column 3 now with user_id in column 1)
-                    sheet.update_cell(idx + 2, 3, str(value))
-                    return True
-
-            # Create new row
-            sheet.append_row([target_user_id, variable, str(value), description, var_type])
+            key = (variable, target_user_id)
+
+            _, data, values, rows = await self._load_config_async()
+            row_index = rows.get(key)
+            if row_index is not None:
+                current = await asyncio.to_thread(_with_retry, sheet.row_values, row_index)
+                if [str(cell).strip() for cell in current[:2]] != [target_user_id, variable]:
+                    # Rows have moved since the index was built - reload it
+                    self._config_cache = None
+                    _, data, values, rows = await self._load_config_async()
+                    row_index = rows.get(key)
+
+            if row_index is not None:
+                # Update existing row (value is in column 3 now with user_id in column 1)
+                await asyncio.to_thread(_with_retry, sheet.update_cell, row_index, 3, str(value))
+                if row_index - 2 < len(data):
+                    data[row_index - 2]['value'] = str(value)
+            else:
+                # Create new row
+                new_row = [target_user_id, variable, str(value), description, var_type]
+                await asyncio.to_thread(_with_retry, sheet.append_row, new_row, retry_on=RATE_LIMIT_STATUS_CODES)
+                data.append(dict(zip(SHEET_COLUMNS["Config"], new_row)))
+                rows[key] = len(data) + 1
+
+            # Keep the cached index in step with the write
+            values[key] = str(value)
             return True
         except Exception as e:
             print(f"Error setting config: {e}")
+            self._config_cache = None
             return False
 
     async def delete_user_config(self, variable: str, user_id: str) -> bool:
         """Delete a user-specific config override (reverts to global default)."""
         try:
-            sheet = self.spreadsheet.worksheet("Config")
-            data = sheet.get_all_records()
+            sheet = self._ws("Config")
+            data = await asyncio.to_thread(self._get_records, sheet)
+            target_user_id = str(user_id)
 
             for idx, row in enumerate(data):
                 row_var = str(row.get('variable', ''))
                 row_user_id = str(row.get('user_id', '')).strip()
 
-                if row_var == variable and row_user_id == str(user_id):
-                    sheet.delete_rows(idx + 2)
+                if row_var == variable and row_user_id == target_user_id:
+                    await asyncio.to_thread(_with_retry, sheet.delete_rows, idx + 2, retry_on=RATE_LIMIT_STATUS_CODES)
                     return True
 
             return False
         except Exception as e:
             print(f"Error deleting user config: {e}")
             return False
+        finally:
+            self._config_cache = None
 
     def initialize_default_config(self):
         """Initialize default config values if Config sheet is empty"""
         try:
-            sheet = self.spreadsheet.worksheet("Config")
-            data = sheet.get_all_records()
+            sheet = self._ws("Config")
+            # Goes through the Config cache, so the first get_config after startup is free
+            data, _ = self._get_config_records()
             if data:  # Already has data
                 return
 
@@ -495,10 +949,12 @@ class SheetsClient:
                 ["", "debug_mode", "false", "Enable verbose debug logging", "bool"]
             ]
 
-            # Add all defaults
-            for row in defaults:
-                sheet.append_row(row)
+            # Add all defaults in one request, stored as typed (e.g. "10,14,18" stays text)
+            _with_retry(sheet.append_rows, defaults, value_input_option=ValueInputOption.raw,
+                        retry_on=RATE_LIMIT_STATUS_CODES)
             print("Initialized default Config values")
 
         except Exception as e:
-            print(f"Error initializing default config: {e}")
\ No newline at end of file
+            print(f"Error initializing default config: {e}")
+        finally:
+            self._config_cache = None
\ No newline at end of file
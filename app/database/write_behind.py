@@ -0,0 +1,182 @@
+import asyncio
+import atexit
+import concurrent.futures
+import queue
+import threading
+import time
+from typing import Any, Dict, List
+
+# How long the writer waits after the first queued write so a burst goes out as one batch
+WRITE_DEBOUNCE_SECONDS = 0.05
+# Sends per write (the first plus retries) before it counts as failed
+WRITE_ATTEMPTS = 2
+# Failures kept for flush(); older ones are dropped beyond this
+MAX_RECORDED_FAILURES = 100
+
+
+class _InlineExecutor(concurrent.futures.ThreadPoolExecutor):
+    """Runs each submitted call right away on the calling thread.
+
+    The writer loop's default executor, so the sheets client's asyncio.to_thread
+    calls block the writer thread instead of starting worker threads - which
+    can't be started once interpreter shutdown has begun, when atexit drains
+    the queue.
+    """
+
+    def submit(self, fn, /, *args, **kwargs):
+        future = concurrent.futures.Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+
+class WriteBehindQueue:
+    """Runs sheet appends/updates on a background thread so callers don't wait on the network.
+
+    The bot drives agents from short-lived event loops (one per message), so the
+    writer owns a thread and loop of its own rather than a task on the caller's
+    loop. Writes queued within the debounce window go out together: one
+    append_rows and one update_rows call per sheet, with updates to the same
+    row merged. Pending writes are flushed at interpreter exit.
+
+    Callers are told a write succeeded before it is sent; writes that fail are
+    queued again once, then logged and returned by the next flush().
+    """
+
+    def __init__(self, sheets_client, debounce: float = WRITE_DEBOUNCE_SECONDS):
+        self.sheets = sheets_client
+        self.debounce = debounce
+        self._queue: queue.Queue = queue.Queue()
+        # Descriptions of failed writes not yet returned by flush()
+        self._failures: List[str] = []
+        self._failures_lock = threading.Lock()
+        self._dropped_failures = 0
+        self._thread = threading.Thread(target=self._writer_loop, name="sheets-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.join)
+
+    def append(self, sheet_name: str, row_data: Dict[str, Any]):
+        self._queue.put(("append", sheet_name, row_data, 0))
+
+    def update(self, sheet_name: str, row_index: int, row_data: Dict[str, Any]):
+        self._queue.put(("update", sheet_name, (row_index, row_data), 0))
+
+    def join(self):
+        """Block until every queued write has been sent"""
+        self._queue.join()
+
+    async def wait(self):
+        """Wait for every queued write without blocking the caller's event loop"""
+        if self._queue.unfinished_tasks:
+            await asyncio.to_thread(self._queue.join)
+
+    async def flush(self) -> List[str]:
+        """wait(), then return the writes that failed since the last flush"""
+        await self.wait()
+        with self._failures_lock:
+            failures, self._failures = self._failures, []
+            dropped, self._dropped_failures = self._dropped_failures, 0
+        if dropped:
+            failures.insert(0, f"{dropped} earlier background write failures were not kept")
+        return failures
+
+    def _record_failure(self, message: str):
+        print(message)
+        with self._failures_lock:
+            self._failures.append(message)
+            if len(self._failures) > MAX_RECORDED_FAILURES:
+                del self._failures[0]
+                self._dropped_failures += 1
+
+    def _writer_loop(self):
+        loop = asyncio.new_event_loop()
+        loop.set_default_executor(_InlineExecutor())
+        while True:
+            batch = [self._queue.get()]
+            time.sleep(self.debounce)
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                self._send(loop, batch)
+            except Exception as e:
+                # Never let one bad batch end the thread - wait(), flush() and join() rely on it
+                self._record_failure(f"Error sending {len(batch)} queued writes in background: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _send(self, loop, batch: List[tuple]):
+        """One append_rows per sheet for the batch's appends, one update_rows per sheet for its updates"""
+        appends: Dict[str, List[tuple]] = {}
+        updates: Dict[str, List[tuple]] = {}
+        for op, sheet_name, payload, attempt in self._coalesce(batch):
+            (appends if op == "append" else updates).setdefault(sheet_name, []).append((payload, attempt))
+
+        for sheet_name, entries in appends.items():
+            if hasattr(self.sheets, 'append_rows'):
+                rows = [row_data for row_data, _ in entries]
+                sent = self._call(loop, sheet_name, self.sheets.append_rows, sheet_name, rows)
+                failed = [] if sent else entries
+            else:
+                failed = [entry for entry in entries
+                          if not self._call(loop, sheet_name, self.sheets.append_row, sheet_name, entry[0])]
+            self._retry_or_record("append", sheet_name, failed)
+
+        for sheet_name, entries in updates.items():
+            if hasattr(self.sheets, 'update_rows'):
+                row_updates = [row_update for row_update, _ in entries]
+                sent = self._call(loop, sheet_name, self.sheets.update_rows, sheet_name, row_updates)
+                failed = [] if sent else entries
+            else:
+                failed = [entry for entry in entries
+                          if not self._call(loop, sheet_name, self.sheets.update_row, sheet_name, *entry[0])]
+            self._retry_or_record("update", sheet_name, failed)
+
+    @staticmethod
+    def _call(loop, sheet_name: str, method, *args) -> bool:
+        """Run one sheets client write; the client prints and returns False on failure rather than raising"""
+        try:
+            return loop.run_until_complete(method(*args)) is not False
+        except Exception as e:
+            print(f"Error writing to {sheet_name} in background: {e}")
+            return False
+
+    def _retry_or_record(self, op: str, sheet_name: str, failed: List[tuple]):
+        """Queue failed writes for another attempt, recording those that are out of attempts"""
+        given_up = []
+        for payload, attempt in failed:
+            if attempt + 1 < WRITE_ATTEMPTS:
+                self._queue.put((op, sheet_name, payload, attempt + 1))
+            else:
+                given_up.append(payload)
+        if not given_up:
+            return
+        if op == "append":
+            what = f"append of {len(given_up)} rows"
+        else:
+            what = f"update of rows {[row_index for row_index, _ in given_up]}"
+        self._record_failure(f"Error writing to {sheet_name} in background: {what} failed "
+                             f"after {WRITE_ATTEMPTS} attempts")
+
+    @staticmethod
+    def _coalesce(batch: List[tuple]) -> List[tuple]:
+        """Merge updates to the same row into the first one, keeping queue order otherwise"""
+        ops = []
+        update_slots = {}  # (sheet, row) -> position in ops
+        for op, sheet_name, payload, attempt in batch:
+            if op == "update":
+                row_index, row_data = payload
+                slot = update_slots.get((sheet_name, row_index))
+                if slot is not None:
+                    ops[slot][2][1].update(row_data)
+                    continue
+                update_slots[(sheet_name, row_index)] = len(ops)
+                payload = (row_index, dict(row_data))
+            ops.append((op, sheet_name, payload, attempt))
+        return ops
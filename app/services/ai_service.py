@@ -4,8 +4,13 @@ from langchain_core.output_parsers import JsonOutputParser
 from langchain_core.tools import tool
 from langchain_groq import ChatGroq
 import json
+from functools import cached_property
 from typing import Dict, Any, List
 from datetime import datetime, timedelta
+from app.utils.action_stream import ActionStreamParser
+
+# Action arrays reason_and_act_stream yields provisionally, for embedding warm-up
+STREAMED_ACTION_KEYS = ('memory_actions',)
 
 class AIService:
     def _extract_json_from_response(self, text: str) -> Dict[str, Any]:
@@ -192,9 +197,10 @@ class AIService:
         # This is handled in VectorProcessor
         raise NotImplementedError("Use VectorProcessor for embeddings")
 
-    async def reason_and_act(self, context: Dict[str, Any], user_input: str) -> Dict[str, Any]:
-        """Main reasoning function for agent behavior - optimized for token limits"""
-        prompt = ChatPromptTemplate.from_template("""You are a smart, proactive assistant who helps the user think through problems and get things done. Act like a helpful colleague, not a task tracker.
+    @cached_property
+    def _reasoning_prompt(self) -> ChatPromptTemplate:
+        """Prompt for reason_and_act - static, so parsed once per service"""
+        return ChatPromptTemplate.from_template("""You are a smart, proactive assistant who helps the user think through problems and get things done. Act like a helpful colleague, not a task tracker.
 
 CONTEXT:
 Memories: {memories}
@@ -361,28 +367,60 @@ OUTPUT FORMAT (respond with this exact structure):
 
 BE HELPFUL. Don't just acknowledge - actually help solve the problem. Remember: OUTPUT ONLY JSON, nothing else.""")
 
+    def _reasoning_inputs(self, context: Dict[str, Any], user_input: str) -> Dict[str, Any]:
+        calendar_data = json.dumps(context.get('calendar_events', []), default=str)
+        print(f"[DEBUG AI] Calendar events being sent to LLM: {calendar_data}")
+
+        now = datetime.now()
+        tomorrow = now + timedelta(days=1)
+        return {
+            "memories": json.dumps(context.get('memories', []), default=str),
+            "tasks": json.dumps(context.get('tasks', []), default=str),
+            "calendar_events": calendar_data,
+            "conversations": json.dumps(context.get('conversations', []), default=str),
+            "user_input": user_input,
+            "current_date": now.strftime("%Y-%m-%d"),
+            "current_day_of_week": now.strftime("%A"),
+            "tomorrow_date": tomorrow.strftime("%Y-%m-%d (%A)"),
+            "email_style_professional": self.email_style_professional,
+            "email_style_casual": self.email_style_casual
+        }
+
+    async def reason_and_act_stream(self, context: Dict[str, Any], user_input: str):
+        """Streaming reason_and_act.
+
+        Yields (key, action) for each memory action as soon as it is complete in
+        the LLM output, so callers can warm its embeddings while the rest of the reply
+        (usually the long "response" text) is still being generated. These are
+        provisional: only the last item, always (None, result) with the fully parsed
+        result shaped like reason_and_act, says which actions to carry out.
+        """
+        parser = ActionStreamParser(STREAMED_ACTION_KEYS)
+        chunks = []
+        try:
+            chain = self._reasoning_prompt | self.llm
+            async for chunk in chain.astream(self._reasoning_inputs(context, user_input)):
+                text = chunk.content if hasattr(chunk, 'content') else str(chunk)
+                chunks.append(text)
+                for key, action in parser.feed(text):
+                    yield key, action
+        except Exception as e:
+            print(f"Error streaming AI reasoning: {e}")
+            # Streamed actions aren't carried out, so the non-streaming path (with its fallbacks) is safe
+            yield None, await self.reason_and_act(context, user_input)
+            return
+
+        raw_text = ''.join(chunks)
+        print(f"[DEBUG AI] Raw LLM response (first 500 chars): {raw_text[:500]}")
+        yield None, self._extract_json_from_response(raw_text)
+
+    async def reason_and_act(self, context: Dict[str, Any], user_input: str) -> Dict[str, Any]:
+        """Main reasoning function for agent behavior - optimized for token limits"""
         try:
             # Don't use JsonOutputParser - it fails when LLM outputs text before JSON
             # Instead, get raw output and extract JSON ourselves
-            chain = prompt | self.llm
-
-            calendar_data = json.dumps(context.get('calendar_events', []), default=str)
-            print(f"[DEBUG AI] Calendar events being sent to LLM: {calendar_data}")
-
-            now = datetime.now()
-            tomorrow = now + timedelta(days=1)
-            raw_result = await chain.ainvoke({
-                "memories": json.dumps(context.get('memories', []), default=str),
-                "tasks": json.dumps(context.get('tasks', []), default=str),
-                "calendar_events": calendar_data,
-                "conversations": json.dumps(context.get('conversations', []), default=str),
-                "user_input": user_input,
-                "current_date": now.strftime("%Y-%m-%d"),
-                "current_day_of_week": now.strftime("%A"),
-                "tomorrow_date": tomorrow.strftime("%Y-%m-%d (%A)"),
-                "email_style_professional": self.email_style_professional,
-                "email_style_casual": self.email_style_casual
-            })
+            chain = self._reasoning_prompt | self.llm
+            raw_result = await chain.ainvoke(self._reasoning_inputs(context, user_input))
 
             # Extract content from AIMessage
             raw_text = raw_result.content if hasattr(raw_result, 'content') else str(raw_result)
@@ -0,0 +1,83 @@
+import json
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class ActionStreamParser:
+    """Incrementally pulls completed action objects out of a streamed JSON reply.
+
+    Feed it LLM output chunks as they arrive; `feed()` returns (key, action) for
+    every object that has fully closed inside one of the watched top-level arrays
+    (e.g. "memory_actions"). Prose before the first '{' is skipped, matching
+    AIService._extract_json_from_response.
+    """
+
+    def __init__(self, keys: Iterable[str]):
+        self.keys = frozenset(keys)
+        self._text = ''
+        self._pos = 0
+        self._depth = 0
+        self._started = False
+        self._done = False
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_string: Optional[str] = None
+        self._pending_key: Optional[str] = None  # last top-level key seen before ':'
+        self._array_key: Optional[str] = None  # watched array we're currently inside
+        self._object_start: Optional[int] = None
+
+    def feed(self, chunk: str) -> List[Tuple[str, Dict]]:
+        if self._done or not chunk:
+            return []
+        self._text += chunk
+        found = []
+        text = self._text
+
+        for i in range(self._pos, len(text)):
+            char = text[i]
+            if not self._started:
+                if char != '{':
+                    continue
+                self._started = True
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    self._last_string = text[self._string_start + 1:i]
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = i
+            elif char == '{' or char == '[':
+                self._depth += 1
+                if char == '[' and self._depth == 2 and self._pending_key in self.keys:
+                    self._array_key = self._pending_key
+                elif char == '{' and self._depth == 3 and self._array_key:
+                    self._object_start = i
+            elif char == '}' or char == ']':
+                if char == '}' and self._depth == 3 and self._object_start is not None:
+                    try:
+                        action = json.loads(text[self._object_start:i + 1])
+                        if isinstance(action, dict):
+                            found.append((self._array_key, action))
+                    except json.JSONDecodeError:
+                        pass
+                    self._object_start = None
+                self._depth -= 1
+                if self._depth < 2:
+                    self._array_key = None
+                if self._depth == 0:
+                    self._done = True
+                    break
+            elif char == ':' and self._depth == 1:
+                self._pending_key = self._last_string
+            elif char == ',' and self._depth == 1:
+                self._pending_key = None
+
+        self._pos = len(text)
+        return found
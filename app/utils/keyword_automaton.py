@@ -0,0 +1,60 @@
+from collections import deque
+from typing import Dict, FrozenSet, Iterable, List
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton that maps substring keyword hits to category labels.
+
+    Built once from {category: keywords}; `categories(text)` then reports every
+    category with at least one keyword occurring in `text`, in a single pass.
+    Matching is case-sensitive, so callers pass already-lowercased text.
+    """
+
+    def __init__(self, keyword_sets: Dict[str, Iterable[str]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[FrozenSet[str]] = [frozenset()]
+
+        for category, keywords in keyword_sets.items():
+            for keyword in keywords:
+                self._add(keyword, category)
+        self._build()
+
+    def _add(self, keyword: str, category: str):
+        state = 0
+        for ch in keyword:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(frozenset())
+                self._goto[state][ch] = nxt
+            state = nxt
+        self._out[state] = self._out[state] | {category}
+
+    def _build(self):
+        """Compute failure links breadth-first and merge outputs along them"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] | self._out[self._fail[nxt]]
+
+    def categories(self, text: str) -> FrozenSet[str]:
+        """Return the set of categories with a keyword occurring in text"""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        hits = set()
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                hits |= out[state]
+        return frozenset(hits)
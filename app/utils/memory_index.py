@@ -0,0 +1,207 @@
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional
+import numpy as np
+
+# FAISS is optional - falls back to exact NumPy inner-product search
+try:
+    import faiss
+    FAISS_AVAILABLE = True
+except ImportError:
+    faiss = None
+    FAISS_AVAILABLE = False
+
+# IVFPQ needs enough vectors to train its coarse quantizer; below this use a flat index
+IVFPQ_MIN_TRAIN = 1024
+IVF_NLIST = 64
+IVF_NPROBE = 8
+PQ_M = 16
+PQ_NBITS = 8
+
+
+def _memory_id(key: str) -> int:
+    """Stable non-negative int64 id for a memory key"""
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'big') >> 1
+
+
+def _fingerprint(value: str) -> str:
+    return hashlib.blake2b(value.encode(), digest_size=16).hexdigest()
+
+
+class MemoryIndex:
+    """Persistent per-user index of L2-normalized memory embeddings.
+
+    `sync()` reconciles the index with the user's current memory list, embedding
+    only memories that are new or whose value changed, so a conversation turn
+    costs one inner-product search instead of re-parsing and re-scoring every
+    stored embedding.
+    """
+
+    def __init__(self, vector_processor, path: Optional[str] = None):
+        self.vector = vector_processor
+        self.path = path
+        self._ids = np.empty(0, dtype=np.int64)
+        self._vectors: Optional[np.ndarray] = None  # (N, d) float32, rows L2-normalized
+        self._fingerprints: Dict[int, str] = {}
+        self._memories: Dict[int, Dict] = {}  # id -> memory dict for hydration
+        self._index = None  # FAISS index over _vectors, built lazily
+
+        if path and os.path.exists(path):
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _embed(self, text: str) -> np.ndarray:
+        vec = np.asarray(self.vector.get_embedding(text), dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def _memory_vector(self, mem: Dict, expected_dim: int) -> Optional[np.ndarray]:
+        """Use the stored embedding when it matches the model, otherwise re-embed the value"""
+        embedding = mem.get('embedding')
+        try:
+            if isinstance(embedding, str):
+                embedding = json.loads(embedding) if embedding else []
+        except json.JSONDecodeError:
+            embedding = []
+
+        if embedding and len(embedding) == expected_dim:
+            vec = np.asarray(embedding, dtype=np.float32)
+            norm = np.linalg.norm(vec)
+            return vec / norm if norm else vec
+
+        value = str(mem.get('value', ''))
+        return self._embed(value) if value else None
+
+    def sync(self, memories: List[Dict]):
+        """Bring the index in line with the user's current memories"""
+        expected_dim = self.vector.embedder.get_sentence_embedding_dimension()
+        if self._vectors is not None and self._vectors.shape[1] != expected_dim:
+            # Embedding model changed since the index was built: start over
+            self._ids, self._vectors, self._index = np.empty(0, dtype=np.int64), None, None
+            self._fingerprints = {}
+
+        seen = set()
+        stale = []
+        new_ids = []
+        new_vectors = []
+
+        for mem in memories:
+            key = str(mem.get('key', ''))
+            if not key:
+                continue
+            mem_id = _memory_id(key)
+            seen.add(mem_id)
+            self._memories[mem_id] = mem
+
+            fingerprint = _fingerprint(str(mem.get('value', '')))
+            if self._fingerprints.get(mem_id) == fingerprint:
+                continue
+
+            vec = self._memory_vector(mem, expected_dim)
+            if vec is None:
+                continue
+            if mem_id in self._fingerprints:
+                stale.append(mem_id)
+            self._fingerprints[mem_id] = fingerprint
+            new_ids.append(mem_id)
+            new_vectors.append(vec)
+
+        removed = [mem_id for mem_id in self._fingerprints if mem_id not in seen]
+        for mem_id in removed:
+            del self._fingerprints[mem_id]
+            self._memories.pop(mem_id, None)
+
+        drop = stale + removed
+        if not drop and not new_ids:
+            return
+
+        if drop and len(self._ids):
+            keep = ~np.isin(self._ids, drop)
+            self._ids = self._ids[keep]
+            self._vectors = self._vectors[keep]
+            if self._index is not None:
+                self._index.remove_ids(np.asarray(drop, dtype=np.int64))
+
+        if new_ids:
+            ids = np.asarray(new_ids, dtype=np.int64)
+            vectors = np.vstack(new_vectors).astype(np.float32)
+            if self._vectors is None:
+                self._ids, self._vectors, self._index = ids, vectors, None
+            else:
+                self._ids = np.concatenate([self._ids, ids])
+                self._vectors = np.vstack([self._vectors, vectors])
+                if self._index is not None and not self._needs_retrain():
+                    self._index.add_with_ids(vectors, ids)
+                else:
+                    self._index = None
+
+        self._save()
+
+    def _needs_retrain(self) -> bool:
+        """A flat index should be replaced by IVFPQ once there is enough data to train it"""
+        return FAISS_AVAILABLE and len(self._ids) >= IVFPQ_MIN_TRAIN and not isinstance(self._index, faiss.IndexIVFPQ)
+
+    def _faiss_index(self):
+        if self._index is None:
+            dim = self._vectors.shape[1]
+            if len(self._ids) >= IVFPQ_MIN_TRAIN and dim % PQ_M == 0:
+                self._quantizer = faiss.IndexFlatIP(dim)
+                index = faiss.IndexIVFPQ(self._quantizer, dim, IVF_NLIST, PQ_M, PQ_NBITS,
+                                         faiss.METRIC_INNER_PRODUCT)
+                index.train(self._vectors)
+                index.nprobe = IVF_NPROBE
+            else:
+                index = faiss.IndexIDMap(faiss.IndexFlatIP(dim))
+            index.add_with_ids(self._vectors, self._ids)
+            self._index = index
+        return self._index
+
+    def search(self, query: str, limit: int = 5, threshold: float = 0.3) -> List[Dict]:
+        """Return up to `limit` memories by cosine similarity, shaped like search_similar output"""
+        if not query.strip() or not len(self._ids):
+            return []
+
+        q = self._embed(query)
+        if q.shape[0] != self._vectors.shape[1]:
+            return []
+
+        if FAISS_AVAILABLE:
+            scores, ids = self._faiss_index().search(q[None, :], limit)
+            hits = zip(scores[0], ids[0])
+        else:
+            scores = self._vectors @ q
+            k = min(limit, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            hits = zip(scores[top], self._ids[top])
+
+        results = []
+        for score, mem_id in hits:
+            mem = self._memories.get(int(mem_id))
+            if mem is not None and score >= threshold:
+                results.append({**mem, 'similarity_score': float(score)})
+        return results
+
+    def _load(self):
+        try:
+            data = np.load(self.path, allow_pickle=False)
+            self._ids = data['ids'].astype(np.int64)
+            self._vectors = data['vectors'].astype(np.float32)
+            self._fingerprints = dict(zip(self._ids.tolist(), data['fingerprints'].tolist()))
+        except Exception as e:
+            print(f"Could not load memory index {self.path}: {e}")
+            self._ids, self._vectors, self._fingerprints = np.empty(0, dtype=np.int64), None, {}
+
+    def _save(self):
+        if not self.path or self._vectors is None:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            fingerprints = np.asarray([self._fingerprints[i] for i in self._ids.tolist()], dtype='U32')
+            with open(self.path, 'wb') as f:
+                np.savez(f, ids=self._ids, vectors=self._vectors, fingerprints=fingerprints)
+        except Exception as e:
+            print(f"Could not save memory index {self.path}: {e}")
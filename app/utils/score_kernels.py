@@ -0,0 +1,44 @@
+import numpy as np
+
+# Numba is optional - without it the kernels run as vectorized NumPy
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    njit = None
+    NUMBA_AVAILABLE = False
+
+
+def _overlap_scores_numpy(query_mask: np.ndarray, indptr: np.ndarray, indices: np.ndarray) -> np.ndarray:
+    # Sparse mat-vec: per-row sums of query hits via prefix sums over the CSR rows
+    hits = np.concatenate((np.zeros(1, dtype=np.int64), np.cumsum(query_mask[indices], dtype=np.int64)))
+    return hits[indptr[1:]] - hits[indptr[:-1]]
+
+
+def _pack_task_keys_numpy(not_pending: np.ndarray, priority: np.ndarray) -> np.ndarray:
+    return (not_pending.astype(np.uint16) << 2) | priority.astype(np.uint16)
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def overlap_scores(query_mask, indptr, indices):
+        """Number of query tokens present in each CSR row"""
+        n_rows = indptr.shape[0] - 1
+        scores = np.zeros(n_rows, dtype=np.int64)
+        for row in range(n_rows):
+            total = 0
+            for j in range(indptr[row], indptr[row + 1]):
+                total += query_mask[indices[j]]
+            scores[row] = total
+        return scores
+
+    @njit(cache=True)
+    def pack_task_keys(not_pending, priority):
+        """Pack (not pending, priority rank) per task into one sortable uint16"""
+        keys = np.empty(not_pending.shape[0], dtype=np.uint16)
+        for i in range(not_pending.shape[0]):
+            keys[i] = (np.uint16(not_pending[i]) << 2) | np.uint16(priority[i])
+        return keys
+else:
+    overlap_scores = _overlap_scores_numpy
+    pack_task_keys = _pack_task_keys_numpy
@@ -0,0 +1,72 @@
+import time
+from typing import Any, List, Optional, Tuple
+import numpy as np
+
+
+class SemanticResponseCache:
+    """Per-user cache of responses keyed by query embedding.
+
+    A lookup hits when a query from the same user within the last `ttl_seconds`
+    has cosine similarity >= `threshold` with the new one, so near-duplicate
+    phrasings ("what's on my calendar today" / "show today's calendar") skip the
+    LLM entirely. Oldest entries are evicted once `max_entries` is reached.
+
+    Each entry also records the `version` of the data it was answered from
+    (e.g. sheet etags) and only matches lookups made with the same version, so
+    a change to that data retires the answers built on it.
+    """
+
+    def __init__(self, max_entries: int = 512, threshold: float = 0.9, ttl_seconds: float = 600):
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self._vectors: Optional[np.ndarray] = None  # (N, d) float32, rows L2-normalized
+        self._meta: List[Tuple[str, str, float, Any]] = []  # (user_id, response, created_at, version)
+
+    @staticmethod
+    def _normalize(vec) -> np.ndarray:
+        vec = np.asarray(vec, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def lookup(self, user_id: str, query_vec, version: Any = None) -> Optional[str]:
+        """Return a cached response for a near-identical recent query on the same data version, if any"""
+        if self._vectors is None or not self._meta:
+            return None
+        q = self._normalize(query_vec)
+        if q.shape[0] != self._vectors.shape[1]:
+            return None
+
+        scores = self._vectors @ q
+        now = time.monotonic()
+        for idx in np.argsort(-scores):
+            if scores[idx] < self.threshold:
+                break
+            entry_user, response, created_at, entry_version = self._meta[idx]
+            if entry_user == user_id and entry_version == version and now - created_at < self.ttl_seconds:
+                return response
+        return None
+
+    def add(self, user_id: str, query_vec, response: str, version: Any = None):
+        q = self._normalize(query_vec)
+        if self._vectors is None or self._vectors.shape[1] != q.shape[0]:
+            self._vectors = q[None, :]
+            self._meta = [(user_id, response, time.monotonic(), version)]
+            return
+
+        self._vectors = np.vstack([self._vectors, q])
+        self._meta.append((user_id, response, time.monotonic(), version))
+        if len(self._meta) > self.max_entries:
+            overflow = len(self._meta) - self.max_entries
+            self._vectors = self._vectors[overflow:]
+            self._meta = self._meta[overflow:]
+
+    def invalidate(self, user_id: str):
+        """Drop all entries for a user (call after anything that changes their data)"""
+        if not self._meta:
+            return
+        keep = [i for i, (entry_user, *_) in enumerate(self._meta) if entry_user != user_id]
+        if len(keep) == len(self._meta):
+            return
+        self._vectors = self._vectors[keep] if keep else None
+        self._meta = [self._meta[i] for i in keep]
@@ -6,7 +6,8 @@ import json
 from datetime import datetime, timedelta
 
 class VectorProcessor:
-    def __init__(self, model_name: str = 'all-mpnet-base-v2', cache_size: int = 1000):
+    def __init__(self, model_name: str = 'all-mpnet-base-v2', cache_size: int = 1000,
+                 embedding_dtype=np.float16):
         """
         Initialize vector processor with specified embedding model.
         
@@ -14,6 +15,9 @@ class VectorProcessor:
         - all-mpnet-base-v2: Best quality (768 dims, slower)
         - all-MiniLM-L6-v2: Fast, good quality (384 dims)
         - bge-large-en-v1.5: Excellent for RAG (1024 dims)
+
+        embedding_dtype is the storage type of matrices from build_embedding_matrix;
+        float16 halves their size, pass np.float32 to keep full precision.
         """
         print(f"Loading embedding model: {model_name}")
         try:
@@ -25,6 +29,7 @@ class VectorProcessor:
             self.model_name = 'all-MiniLM-L6-v2'
         
         self.embedding_cache = LRU(cache_size)  # Cache embeddings
+        self.embedding_dtype = np.dtype(embedding_dtype)
         print(f"Embedding model loaded: {self.model_name}")
 
     def get_embedding(self, text: str) -> List[float]:
@@ -66,8 +71,11 @@ class VectorProcessor:
         query_embedding = self.get_embedding(query)
         expected_dim = len(query_embedding)
 
-        results = []
-        for item in items:
+        # Collect comparable embeddings, then score them all with one matrix-vector product
+        candidates = []  # (position, item)
+        vectors = []
+        results = []  # (position, result)
+        for position, item in enumerate(items):
             # Filter by user_id if specified (items may already be filtered)
             if user_id and item.get('user_id') and str(item.get('user_id')) != str(user_id):
                 continue
@@ -79,7 +87,7 @@ class VectorProcessor:
                 item_embedding = item.get('embedding', '[]')
                 if isinstance(item_embedding, str):
                     item_embedding = json.loads(item_embedding) if item_embedding else []
-                
+
                 # If no stored embedding OR dimension mismatch, regenerate from content
                 if not item_embedding or len(item_embedding) != expected_dim:
                     content = item.get('value', item.get('content', item.get('description', '')))
@@ -88,24 +96,90 @@ class VectorProcessor:
                     else:
                         continue
 
-                similarity = self.cosine_similarity(query_embedding, item_embedding)
-                if similarity >= threshold:
-                    results.append({
-                        **item,
-                        'similarity_score': float(similarity)
-                    })
-            except (json.JSONDecodeError, KeyError, TypeError) as e:
+                vectors.append(np.asarray(item_embedding, dtype=np.float64))
+                candidates.append((position, item))
+            except (json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
                 # If embedding fails, do a simple text match as fallback
                 content = str(item.get('value', item.get('content', ''))).lower()
                 if query.lower() in content:
-                    results.append({
+                    results.append((position, {
                         **item,
                         'similarity_score': 0.5  # Medium score for text match
-                    })
-
-        # Sort by similarity and return top results
-        results.sort(key=lambda x: x.get('similarity_score', 0), reverse=True)
-        return results[:limit]
+                    }))
+
+        if vectors:
+            matrix = np.vstack(vectors)
+            query_vec = np.asarray(query_embedding, dtype=np.float64)
+            denom = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query_vec)
+            # Zero-norm vectors score 0, as in cosine_similarity
+            scores = np.divide(matrix @ query_vec, denom, out=np.zeros(len(vectors)), where=denom > 0)
+            for i in np.flatnonzero(scores >= threshold):
+                position, item = candidates[i]
+                results.append((position, {
+                    **item,
+                    'similarity_score': float(scores[i])
+                }))
+
+        # Sort by similarity (ties keep input order) and return top results
+        results.sort(key=lambda r: (-r[1]['similarity_score'], r[0]))
+        return [result for _, result in results[:limit]]
+
+    def build_embedding_matrix(self, items: List[Dict]) -> np.ndarray:
+        """Stack item embeddings into an L2-normalized (N, D) matrix of embedding_dtype.
+
+        Stored embeddings are parsed once; items with a missing, unparsable or
+        wrong-dimension embedding are re-embedded from their content, as in
+        search_similar. Rows with nothing to embed are left as zeros.
+        """
+        expected_dim = self.embedder.get_sentence_embedding_dimension()
+        matrix = np.zeros((len(items), expected_dim), dtype=np.float32)
+        for i, item in enumerate(items):
+            embedding = item.get('embedding', '[]')
+            try:
+                if isinstance(embedding, str):
+                    embedding = json.loads(embedding) if embedding else []
+            except json.JSONDecodeError:
+                embedding = []
+            if isinstance(embedding, list) and len(embedding) == expected_dim:
+                try:
+                    matrix[i] = embedding
+                    continue
+                except (TypeError, ValueError):
+                    pass
+            content = item.get('value', item.get('content', item.get('description', '')))
+            if content:
+                matrix[i] = self.get_embedding(str(content))
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix.astype(self.embedding_dtype, copy=False)
+
+    def search_similar_matrix(self, query: str, emb_matrix: np.ndarray, meta: List[Dict],
+                              category: str = None, limit: int = 5, threshold: float = 0.3) -> List[Dict]:
+        """search_similar over a prebuilt embedding matrix (see build_embedding_matrix).
+
+        Cosine similarity for every row is one matrix-vector product; `meta[i]`
+        is the item for row i.
+        """
+        if not query.strip() or not meta:
+            return meta[:limit] if meta else []
+
+        query_vec = np.asarray(self.get_embedding(query), dtype=np.float32)
+        norm = np.linalg.norm(query_vec)
+        if norm == 0 or query_vec.shape[0] != emb_matrix.shape[1]:
+            return []
+
+        # Reduced-precision storage is upcast so scoring still runs in float32
+        scores = emb_matrix.astype(np.float32, copy=False) @ (query_vec / norm)
+        if category:
+            scores[[item.get('category') != category for item in meta]] = -np.inf
+
+        candidates = np.flatnonzero(scores >= threshold)
+        if len(candidates) > limit:
+            # Top-k without sorting every candidate
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        top = candidates[np.argsort(-scores[candidates], kind='stable')]
+        return [{**meta[i], 'similarity_score': float(scores[i])} for i in top]
 
     async def generate_memory_embedding(self, category: str, key: str, value: str) -> str:
         """Generate embedding for memory storage"""
@@ -84,9 +84,9 @@ class SimpleTelegramBot:
             from app.agents.memory_agent import MemoryAgent
             from app.agents.task_agent import TaskAgent
             from app.utils.vector_processor import VectorProcessor
-            from app.config import Settings
+            from app.config import get_settings
 
-            self.config = Settings()
+            self.config = get_settings()
 
             # Validate Telegram API first
             telegram_ok = self._validate_telegram_api()
@@ -1685,6 +1685,27 @@ CONFIGURE:
                 )
                 time.sleep(5)
 
+        # Memory writes are queued in the background - send them before exiting
+        self._flush_pending_writes()
+
+    def _flush_pending_writes(self):
+        """Wait for queued memory writes to reach the sheet and report any that failed"""
+        if not getattr(self, 'memory_agent', None):
+            return
+
+        import asyncio
+        loop = asyncio.new_event_loop()
+        try:
+            failures = loop.run_until_complete(self.memory_agent.flush())
+            if failures:
+                print(f"{len(failures)} background memory write(s) failed:")
+                for failure in failures:
+                    print(f"  {failure}")
+        except Exception as e:
+            print(f"Error flushing memory writes: {e}")
+        finally:
+            loop.close()
+
     def _proactive_loop(self):
         """Background loop for proactive features and health monitoring"""
         print(f"[PROACTIVE] Loop started at {datetime.now(BRISBANE_TZ).strftime('%H:%M:%S')}")
@@ -0,0 +1,95 @@
+import re
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from app.agents.memory_agent import MemoryAgent
+from app.utils.vector_processor import VectorProcessor
+
+# Words the fake embedder knows; anything else (categories, keys, filler words) is ignored
+VOCAB = ["likes", "black", "coffee", "tea", "dog", "named", "rex"]
+
+
+class FakeEmbedder:
+    """Bag-of-words vectors over VOCAB instead of a sentence-transformers model"""
+
+    def encode(self, text):
+        words = re.findall(r"[a-z]+", text.lower())
+        return np.array([float(words.count(word)) for word in VOCAB])
+
+    def get_sentence_embedding_dimension(self):
+        return len(VOCAB)
+
+
+class FakeSheets:
+    """Empty Memories sheet that records what gets written"""
+
+    def __init__(self):
+        self.appended = []
+        self.updated = []
+
+    async def get_sheet_data(self, sheet_name, user_id=None, with_row_index=False):
+        return pd.DataFrame()
+
+    async def find_row_by_id(self, sheet_name, user_id, item_id):
+        return None
+
+    async def append_rows(self, sheet_name, rows):
+        self.appended.extend(rows)
+
+    async def update_rows(self, sheet_name, updates):
+        self.updated.extend(updates)
+
+
+class FakeAI:
+    async def merge_memories(self, existing_value, new_value):
+        return f"{existing_value}; {new_value}"
+
+
+def make_vector_processor():
+    vector = VectorProcessor.__new__(VectorProcessor)
+    vector.embedder = FakeEmbedder()
+    vector.model_name = "fake"
+    vector.embedding_cache = {}
+    vector.embedding_dtype = np.dtype(np.float32)
+    return vector
+
+
+class BulkStoreMemoriesTest(unittest.IsolatedAsyncioTestCase):
+    async def test_near_duplicates_in_one_batch_are_stored_once(self):
+        sheets = FakeSheets()
+        agent = MemoryAgent(sheets, make_vector_processor(), FakeAI())
+
+        results = await agent.bulk_store_memories("1", [
+            {"category": "preferences", "key": "drink_1", "value": "Likes black coffee"},
+            {"category": "preferences", "key": "drink_2", "value": "likes black coffee!"},
+            {"category": "personal", "key": "pet", "value": "dog named Rex"},
+        ])
+        await agent.flush()
+
+        self.assertEqual(results, [
+            "New memory stored: drink_1",
+            "Memory already known: drink_1",
+            "New memory stored: pet",
+        ])
+        self.assertEqual([row["key"] for row in sheets.appended], ["drink_1", "pet"])
+        self.assertEqual(sheets.updated, [])
+
+    async def test_repeated_value_under_another_key_is_stored_once(self):
+        sheets = FakeSheets()
+        agent = MemoryAgent(sheets, make_vector_processor(), FakeAI())
+
+        # None of these words are in VOCAB, so only the text comparison can catch the repeat
+        results = await agent.bulk_store_memories("1", [
+            {"category": "personal", "key": "home", "value": "Lives in Paris"},
+            {"category": "knowledge", "key": "fact_home", "value": "lives in paris "},
+        ])
+        await agent.flush()
+
+        self.assertEqual(results, ["New memory stored: home", "Memory already known: home"])
+        self.assertEqual([row["key"] for row in sheets.appended], ["home"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+import unittest
+
+from app.database import write_behind
+from app.database.write_behind import WriteBehindQueue
+
+
+class FakeSheets:
+    """Records batched writes; the first `failures` calls fail like the real client (False) or raise"""
+
+    def __init__(self, failures=0, raise_errors=False):
+        self.failures = failures
+        self.raise_errors = raise_errors
+        self.appended = []
+        self.updated = []
+
+    def _fail(self):
+        if self.failures <= 0:
+            return False
+        self.failures -= 1
+        if self.raise_errors:
+            raise RuntimeError("quota exceeded")
+        return True
+
+    async def append_rows(self, sheet_name, rows):
+        if self._fail():
+            return False
+        self.appended.append((sheet_name, list(rows)))
+        return True
+
+    async def update_rows(self, sheet_name, updates):
+        if self._fail():
+            return False
+        self.updated.append((sheet_name, list(updates)))
+        return True
+
+
+class CoalesceTest(unittest.TestCase):
+    def test_updates_to_the_same_row_merge_into_the_first(self):
+        batch = [
+            ("update", "Memories", (5, {"value": "a", "confidence": 1.0}), 0),
+            ("append", "Memories", {"key": "new"}, 0),
+            ("update", "Tasks", (5, {"status": "done"}), 0),
+            ("update", "Memories", (5, {"value": "b"}), 0),
+        ]
+
+        self.assertEqual(WriteBehindQueue._coalesce(batch), [
+            ("update", "Memories", (5, {"value": "b", "confidence": 1.0}), 0),
+            ("append", "Memories", {"key": "new"}, 0),
+            ("update", "Tasks", (5, {"status": "done"}), 0),
+        ])
+
+    def test_queued_row_data_is_not_mutated(self):
+        first = {"value": "a"}
+        WriteBehindQueue._coalesce([
+            ("update", "Memories", (2, first), 0),
+            ("update", "Memories", (2, {"value": "b"}), 0),
+        ])
+        self.assertEqual(first, {"value": "a"})
+
+
+class WriteBehindQueueTest(unittest.IsolatedAsyncioTestCase):
+    async def test_batch_goes_out_as_one_call_per_sheet(self):
+        sheets = FakeSheets()
+        writes = WriteBehindQueue(sheets, debounce=0.05)
+
+        writes.append("Memories", {"key": "a"})
+        writes.append("Memories", {"key": "b"})
+        writes.update("Memories", 3, {"value": "x"})
+        writes.update("Memories", 3, {"confidence": 0.5})
+
+        self.assertEqual(await writes.flush(), [])
+        self.assertEqual(sheets.appended, [("Memories", [{"key": "a"}, {"key": "b"}])])
+        self.assertEqual(sheets.updated, [("Memories", [(3, {"value": "x", "confidence": 0.5})])])
+
+    async def test_failed_write_is_retried_once(self):
+        sheets = FakeSheets(failures=1)
+        writes = WriteBehindQueue(sheets, debounce=0)
+
+        writes.append("Memories", {"key": "a"})
+
+        self.assertEqual(await writes.flush(), [])
+        self.assertEqual(sheets.appended, [("Memories", [{"key": "a"}])])
+
+    async def test_write_out_of_attempts_is_returned_by_flush(self):
+        sheets = FakeSheets(failures=write_behind.WRITE_ATTEMPTS, raise_errors=True)
+        writes = WriteBehindQueue(sheets, debounce=0)
+
+        writes.update("Memories", 7, {"value": "x"})
+
+        failures = await writes.flush()
+        self.assertEqual(len(failures), 1)
+        self.assertIn("update of rows [7] failed", failures[0])
+        self.assertEqual(sheets.updated, [])
+        self.assertEqual(await writes.flush(), [])
+
+    async def test_recorded_failures_are_capped(self):
+        writes = WriteBehindQueue(FakeSheets(), debounce=0)
+
+        for i in range(write_behind.MAX_RECORDED_FAILURES + 3):
+            writes._record_failure(f"failure {i}")
+
+        failures = await writes.flush()
+        self.assertEqual(len(failures), write_behind.MAX_RECORDED_FAILURES + 1)
+        self.assertEqual(failures[0], "3 earlier background write failures were not kept")
+        self.assertEqual(failures[1], "failure 3")
+
+    async def test_bad_batch_does_not_stop_the_writer(self):
+        sheets = FakeSheets()
+        writes = WriteBehindQueue(sheets, debounce=0)
+
+        # An update without a (row, data) payload breaks _coalesce
+        writes._queue.put(("update", "Memories", None, 0))
+        failures = await writes.flush()
+        self.assertEqual(len(failures), 1)
+
+        writes.append("Memories", {"key": "a"})
+        self.assertEqual(await writes.flush(), [])
+        self.assertEqual(sheets.appended, [("Memories", [{"key": "a"}])])
+
+
+if __name__ == "__main__":
+    unittest.main()